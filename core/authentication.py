@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """ `JWTAuthentication` loading the user together with its Vendor / Purchaser profile in one query.
+
+    Views, permissions and serializers resolve the profile from `request.user` (see `vms.utils.get_profile`)
+    instead of looking it up again through `user_id`.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")) from e
+
+        try:
+            user = self.user_model.objects \
+                .select_related("vendor", "purchaser") \
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found") from e
+
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token) -> None:
+        """ Rejects inactive users and, with `CHECK_REVOKE_TOKEN`, tokens issued before a password change """
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed")
+
+
+class HydratedUserCache:
+    """ Small thread-safe LRU of user instances, entries expire `ttl` seconds after they were loaded """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize, self.ttl = maxsize, ttl
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.users.move_to_end(user_id)
+                return entry[1]
+        user = load(user_id)
+        with self.lock:
+            self.users[user_id] = (now + self.ttl, user)
+            self.users.move_to_end(user_id)
+            while len(self.users) > self.maxsize:
+                self.users.popitem(last=False)
+        return user
+
+    def evict(self, user_id) -> None:
+        with self.lock:
+            self.users.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.users.clear()
+
+
+hydrated_users = HydratedUserCache(
+    settings.HYDRATED_USER_CACHE_SIZE, settings.HYDRATED_USER_CACHE_TTL)
+
+
+def load_user(user_id):
+    user_model = get_user_model()
+    try:
+        return user_model.objects.select_related("vendor", "purchaser").get(pk=user_id)
+    except user_model.DoesNotExist as e:
+        raise AuthenticationFailed(
+            _("User not found"), code="user_not_found") from e
+
+
+class ClaimsUser(TokenUser):
+    """ Stateless principal read from the access token claims (see `ClaimsTokenObtainPairSerializer`).
+
+    Permissions and profile scoping need only the claims. The `user` instance (and the
+    `vendor` / `purchaser` profile through it) is hydrated on demand from `hydrated_users`. Those
+    instances are shared by the requests of the process, read them (permissions, scoping) but load
+    the profile afresh to change it.
+    """
+
+    @cached_property
+    def account_type(self) -> str:
+        return self.token.get("account_type", "")
+
+    @cached_property
+    def profile_id(self) -> int | None:
+        return self.token.get("profile_id")
+
+    @property
+    def user(self):
+        return hydrated_users.get(self.id, load_user)
+
+    @property
+    def vendor(self):
+        return self.user.vendor
+
+    @property
+    def purchaser(self):
+        return self.user.purchaser
+
+
+class ClaimsJWTAuthentication(ProfileJWTAuthentication):
+    """ Authenticates from the token claims, tokens issued before the claims existed fall back to
+    loading the user (and profile) from the database.
+
+    The active / revoked checks read the user through `hydrated_users`, so a deactivation or password
+    change applies at once in the process that saved it and within `HYDRATED_USER_CACHE_TTL` elsewhere.
+    """
+
+    def get_user(self, validated_token):
+        if "account_type" not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification"))
+        user = ClaimsUser(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE or api_settings.CHECK_REVOKE_TOKEN:
+            self.check_user(user.user, validated_token)
+        return user
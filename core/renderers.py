@@ -0,0 +1,97 @@
+import csv
+import io
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Falls back to DRF's encoder for everything the fast encoders do not handle natively
+# (datetimes are passed through so they keep DRF's millisecond `Z` format)
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """ `JSONRenderer` encoding with orjson when it is installed, same output as the stdlib encoder """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=encode_default,
+                           option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        # Escaped by the stdlib renderer for JavaScript compatibility
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """ Compact binary encoding for service clients, requires msgpack """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, datetime=False)
+
+
+class StreamingRenderer(BaseRenderer):
+    """ Renders rows (dicts) of exports, `stream` encodes them chunk by chunk for a `StreamingHttpResponse` """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream([rows], list(rows[0]) if rows else []))
+
+    def stream(self, chunks, header: list[str]):
+        """ Yields the encoded `header` (when the format has one) and then one bytestring per chunk of rows """
+        raise NotImplementedError
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, chunks, header):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for rows in chunks:
+            writer.writerows([self.encode_cell(row.get(name)) for name in header]
+                             for row in rows)
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue().encode(self.charset)
+
+    def encode_cell(self, value):
+        if isinstance(value, (list, dict)):
+            return FastJSONRenderer().render(value).decode()
+        return value
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """ Newline delimited JSON, one object per line """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def stream(self, chunks, header):
+        renderer = FastJSONRenderer()
+        for rows in chunks:
+            yield b"".join([renderer.render(row) + b"\n" for row in rows])
@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """ `jwtAuth` security scheme of the JWT authentication classes of `core.authentication` """
+    target_class = "core.authentication.ProfileJWTAuthentication"
+    match_subclasses = True
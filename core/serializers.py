@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from vms.utils import get_profile_id
 from .models import User
 
 
@@ -13,3 +15,15 @@ class UserCreateSerializer(serializers.ModelSerializer):
         model = User
         fields = ["username", "password", "name", "account_type",
                   "contact_details", "address"]
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """ Issues tokens carrying what authorization needs, so requests authenticate without a query """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["account_type"] = user.account_type
+        token["profile_id"] = get_profile_id(user)
+        token["is_staff"] = user.is_staff
+        return token
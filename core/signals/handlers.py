@@ -0,0 +1,9 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from core.authentication import hydrated_users
+from core.models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, raw=False, **kwargs):
+    hydrated_users.evict(instance.pk)
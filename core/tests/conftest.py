@@ -1,7 +1,14 @@
 import pytest
 from rest_framework.test import APIClient
+from core.authentication import hydrated_users
 
 
 @pytest.fixture
 def api_client() -> APIClient:
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_hydrated_users():
+    # Ids are reused once a test rolls back
+    hydrated_users.clear()
@@ -2,7 +2,12 @@ from django.conf import settings
 from django.apps import apps
 from django.contrib.auth.hashers import make_password
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from drf_spectacular.generators import SchemaGenerator
+from core.authentication import HydratedUserCache
+from vms.models import Vendor
 import pytest
+import time
 
 
 @pytest.fixture
@@ -129,3 +134,72 @@ class TestUserLogin:
         assert response.status_code == status.HTTP_200_OK
         assert "access" in response_data
         assert "refresh" in response_data
+
+    def test_if_vendor_login_then_tokens_carry_profile_claims(self, login_user, register_user):
+        register_user({"username": "vendor-10", "password": "Success@2023", "account_type": "V",
+                       "name": "Electronify", "contact_details": "", "address": ""})
+
+        response_data = login_user(
+            {"username": "vendor-10", "password": "Success@2023"}).json()
+        access = AccessToken(response_data["access"])
+        refreshed_access = RefreshToken(response_data["refresh"]).access_token
+
+        assert (access["account_type"], access["is_staff"]) == ("V", False)
+        assert access["profile_id"] == Vendor.objects.get().pk
+        assert refreshed_access["profile_id"] == access["profile_id"]
+
+
+    def test_if_user_deactivated_then_claims_token_rejected_with_401(self, api_client, login_user, register_user):
+        register_user({"username": "vendor-10", "password": "Success@2023", "account_type": "V",
+                       "name": "Electronify", "contact_details": "", "address": ""})
+        access = login_user(
+            {"username": "vendor-10", "password": "Success@2023"}).json()["access"]
+        api_client.credentials(HTTP_AUTHORIZATION=f"VMS {access}")
+        assert api_client.get("/api/vendors/me/").status_code == status.HTTP_200_OK
+        user = Vendor.objects.get().user
+        user.is_active = False
+        user.save()
+
+        response = api_client.get("/api/vendors/me/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["code"] == "user_inactive"
+
+class TestHydratedUserCache:
+
+    def test_if_cached_then_loaded_once_until_expired(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        loads = []
+        cache = HydratedUserCache(maxsize=2, ttl=60)
+
+        def load(user_id):
+            loads.append(user_id)
+            return user_id
+        cache.get("1", load)
+        cache.get("1", load)
+        now[0] += 61
+        cache.get("1", load)
+
+        assert loads == ["1", "1"]
+
+    def test_if_full_then_least_recently_used_evicted(self):
+        loads = []
+        cache = HydratedUserCache(maxsize=2, ttl=60)
+
+        def load(user_id):
+            loads.append(user_id)
+            return user_id
+        for user_id in ["1", "2", "1", "3", "1", "2"]:
+            cache.get(user_id, load)
+
+        assert loads == ["1", "2", "3", "2"]
+
+
+class TestApiSchema:
+
+    def test_if_schema_generated_then_jwt_security_scheme_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        assert schema["components"]["securitySchemes"]["jwtAuth"]["name"] == "Authorization"
+        assert {"jwtAuth": []} in schema["paths"]["/api/vendors/"]["get"]["security"]
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import pytest
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.parsers import FastJSONParser, MessagePackParser
+from core.renderers import CSVRenderer, FastJSONRenderer, MessagePackRenderer, NDJSONRenderer
+
+
+def bake_purchase_orders(count):
+    issued_date = datetime(2024, 1, 1, 10, 30, tzinfo=timezone.utc)
+    return [{
+        "id": index,
+        "vendor": index % 100,
+        "purchaser": index % 70,
+        "items": [{"item": "Smart Watch", "quantity": 10}, {"item": "Smart Phone", "quantity": 20}],
+        "quantity": 30,
+        "status": "D",
+        "quality_rating": 4.5,
+        "ordered_date": "2024-01-01T10:00:00.123456Z",
+        "issued_date": (issued_date + timedelta(minutes=index)).isoformat(),
+        "acknowledged_date": None,
+        "expected_delivery_date": None,
+        "actual_delivered_date": None,
+    } for index in range(count)]
+
+
+class TestFastJSONRenderer:
+
+    def test_if_rendered_then_bytes_identical_to_json_renderer(self):
+        data = ReturnDict({
+            "results": bake_purchase_orders(3),
+            "recorded_data": datetime(2024, 1, 1, 10, 30, 5, 123456, tzinfo=timezone.utc),
+            "rating": Decimal("4.25"),
+            "note": "Ünicode \u2028 line separator \u2029",
+            1: "non string key",
+        }, serializer=None)
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_if_orjson_missing_then_falls_back_to_json_renderer(self, monkeypatch):
+        monkeypatch.setattr("core.renderers.orjson", None)
+        data = {"results": bake_purchase_orders(2)}
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_if_indent_requested_then_bytes_identical_to_json_renderer(self):
+        data = {"results": bake_purchase_orders(2)}
+
+        assert FastJSONRenderer().render(data, "application/json; indent=4") == \
+            JSONRenderer().render(data, "application/json; indent=4")
+
+
+class TestFastJSONParser:
+
+    def test_if_parsed_then_same_as_json_parser(self):
+        body = json.dumps({"items": bake_purchase_orders(2)}).encode()
+
+        assert FastJSONParser().parse(io.BytesIO(body)) == \
+            JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize("body", [b'{"vendor": ', b'{"quality_rating": NaN}'])
+    def test_if_invalid_then_parse_error(self, body):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
+
+
+class TestMessagePack:
+
+    def test_if_round_tripped_then_json_compatible_data_returned(self):
+        pytest.importorskip("msgpack")
+        data = {"results": bake_purchase_orders(2),
+                "recorded_data": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+        parsed = MessagePackParser().parse(
+            io.BytesIO(MessagePackRenderer().render(data)))
+
+        assert parsed == json.loads(JSONRenderer().render(data))
+
+    def test_if_invalid_then_parse_error(self):
+        pytest.importorskip("msgpack")
+
+        with pytest.raises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b"\x92\x01"))
+
+
+class TestStreamingRenderers:
+
+    def test_if_csv_streamed_then_one_chunk_per_rows_chunk(self):
+        rows = bake_purchase_orders(3)
+
+        chunks = list(CSVRenderer().stream([rows[:2], rows[2:]], list(rows[0])))
+        parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+
+        assert len(chunks) == 2
+        assert [json.loads(row["items"]) for row in parsed] == [row["items"] for row in rows]
+        assert parsed[0]["acknowledged_date"] == ""
+
+    def test_if_nothing_to_stream_then_csv_header_only(self):
+        assert b"".join(CSVRenderer().stream([], ["id", "status"])) == b"id,status\r\n"
+
+    def test_if_error_rendered_then_single_row(self):
+        data = {"detail": "Authentication credentials were not provided."}
+
+        assert CSVRenderer().render(data) == \
+            b"detail\r\nAuthentication credentials were not provided.\r\n"
+        assert NDJSONRenderer().render(data) == JSONRenderer().render(data) + b"\n"
+
+
+@pytest.mark.benchmark
+class TestRendererBenchmark:
+
+    def test_if_thousand_purchase_orders_encoded_then_compare_formats(self):
+        data = {"next": None, "previous": None,
+                "results": bake_purchase_orders(1000)}
+        formats = [("json", JSONRenderer(), JSONParser()),
+                   ("orjson", FastJSONRenderer(), FastJSONParser())]
+        try:
+            import msgpack
+            formats.append(
+                ("msgpack", MessagePackRenderer(), MessagePackParser()))
+        except ImportError:
+            pass
+
+        def best_of(function, rounds=20):
+            timings = []
+            for _ in range(rounds):
+                started_at = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - started_at)
+            return min(timings)
+
+        results = {}
+        print()
+        for name, renderer, parser in formats:
+            body = renderer.render(data)
+            encode = best_of(lambda: renderer.render(data))
+            decode = best_of(lambda: parser.parse(io.BytesIO(body)))
+            results[name] = encode + decode
+            print(f"{name:8} encode {encode * 1000:6.2f}ms  decode {decode * 1000:6.2f}ms  "
+                  f"size {len(body) / 1024:7.1f}KiB")
+
+        assert results["orjson"] < results["json"]
@@ -8,7 +8,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.utils import extend_schema
 from vms.models import Purchaser, Vendor
 from .models import User
-from .serializers import UserCreateSerializer
+from .serializers import UserCreateSerializer, ClaimsTokenObtainPairSerializer
 
 
 @extend_schema(description="Takes user basic details and login credentials \
@@ -57,6 +57,7 @@ class UserLoginView(TokenObtainPairView):
     Returns `access` and `refresh` tokens for Authorization.
     *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]
     """
+    serializer_class = ClaimsTokenObtainPairSerializer
 
 
 @extend_schema(summary="Renew token")
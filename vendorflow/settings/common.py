@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from datetime import timedelta
+import importlib.util
 import os
 from pathlib import Path
 
@@ -126,11 +127,63 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_METADATA_CLASS": "rest_framework.metadata.SimpleMetadata",
+    "DEFAULT_PAGINATION_CLASS": "vms.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+    # orjson backed when it is installed, stdlib json otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# `application/msgpack` for service to service clients, only when msgpack is installed
+if importlib.util.find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "core.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append(
+        "core.parsers.MessagePackParser")
+
+# Upper bound of the `page_size` query parameter of the list APIs
+MAX_PAGE_SIZE = 500
+
+# Purchase order listings counted exactly up to this many rows (`?count=true`), approximated above
+EXACT_COUNT_THRESHOLD = 1000
+
+# Upper bound of the purchase orders created by one bulk request
+MAX_BULK_PURCHASE_ORDERS = 500
+
+# Rows fetched (and streamed) at once by the purchase order export
+EXPORT_CHUNK_SIZE = 2000
+
+# Vendor list, detail and performance responses are cached in process (LRU with TTL),
+# set `VENDOR_CACHE_URL` (e.g. redis://127.0.0.1:6379/1) to share them between processes.
+# Invalidations only reach the process making them, so more than one serving process needs it
+VENDOR_CACHE_ALIAS = "vendors"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    VENDOR_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["VENDOR_CACHE_URL"],
+        "TIMEOUT": 300,
+    } if os.environ.get("VENDOR_CACHE_URL") else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "vendors",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
 
 SIMPLE_JWT = {
@@ -138,8 +191,22 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5*60),
 }
 
+# Users hydrated from token claims, per process. The TTL also bounds how long other processes
+# keep accepting the tokens of a deactivated user (or, with CHECK_REVOKE_TOKEN, a changed password)
+HYDRATED_USER_CACHE_SIZE = 1024
+HYDRATED_USER_CACHE_TTL = 60  # seconds
+
 RATING_BASE_VALUE = 5  # for calculating rating out of this base value
 
+# Defer vendor metric recomputation to `manage.py run_metrics_worker` instead of doing it within the request
+VENDOR_METRICS_ASYNC = False
+
+# Raw HistoricalPerformance snapshots older than this are pruned once rolled up
+PERFORMANCE_SNAPSHOT_RETENTION_DAYS = 90
+
+# Upper bound of the points returned by the vendor performance history API
+PERFORMANCE_HISTORY_MAX_POINTS = 500
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Vendor Flow APIs',
     'DESCRIPTION': 'Imaginary Vendor Management System',
@@ -13,3 +13,9 @@ DATABASES = {
 }
 
 OPENAPI_DOCUMENT_VISIBILITY = os.getenv("OPENAPI_DOCUMENT_VISIBILITY", False)
+
+# Several workers serve production and invalidations only reach the process making them,
+# without a shared vendor cache the responses are not cached at all
+if not os.environ.get("VENDOR_CACHE_URL"):
+    CACHES[VENDOR_CACHE_ALIAS] = {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache"}
@@ -0,0 +1,79 @@
+import time
+from collections import Counter
+from functools import partial
+from django.core.cache import caches
+from django.db import transaction
+from vms.utils import *
+
+
+# Hits and misses of this process, per namespace kind ("vendors", "vendor")
+stats = Counter()
+
+MISSING = object()
+
+
+def stats_summary() -> dict:
+    """ Hits, misses and hit ratio of this process per namespace kind """
+    summary = {}
+    for kind in sorted({key.rsplit("_", 1)[0] for key in stats}):
+        hits, misses = stats[f"{kind}_hits"], stats[f"{kind}_misses"]
+        summary[kind] = {"hits": hits, "misses": misses,
+                         "hit_ratio": hits / (hits + misses) if hits + misses else None}
+    return summary
+
+
+def get_cache():
+    return caches[settings.VENDOR_CACHE_ALIAS]
+
+
+def namespace_version(namespace: str) -> int:
+    """ Current version of `namespace`, every cached value lives under a key holding it """
+    cache = get_cache()
+    version = cache.get(f"{namespace}:version")
+    if version is None:
+        # Never restart from 1 after an eviction, keys of earlier versions may still be around
+        cache.add(f"{namespace}:version", time.time_ns(), timeout=None)
+        version = cache.get(f"{namespace}:version")
+    return version
+
+
+def cached(namespace: str, key: str, compute):
+    """ Read-through lookup of `key` in the current version of `namespace` """
+    cache = get_cache()
+    versioned_key = f"{namespace}:{namespace_version(namespace)}:{key}"
+    value = cache.get(versioned_key, MISSING)
+    kind = namespace.split(":")[0]
+    if value is MISSING:
+        stats[f"{kind}_misses"] += 1
+        value = compute()
+        cache.set(versioned_key, value)
+    else:
+        stats[f"{kind}_hits"] += 1
+    return value
+
+
+def bump_namespaces(namespaces: list[str]) -> None:
+    cache = get_cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(f"{namespace}:version")
+        except ValueError:
+            cache.add(f"{namespace}:version", time.time_ns(), timeout=None)
+
+
+def invalidate(namespaces: list[str]) -> None:
+    """ Moves the namespaces to a new version now and once more after commit.
+
+    The second bump drops whatever a concurrent reader cached from the not yet committed state.
+    """
+    bump_namespaces(namespaces)
+    transaction.on_commit(partial(bump_namespaces, namespaces))
+
+
+def vendor_namespace(vendor_id: int | str) -> str:
+    return f"vendor:{int(vendor_id)}"
+
+
+def invalidate_vendors(vendor_ids: list[int], directory: bool = False) -> None:
+    """ Invalidates the detail and performance of the vendors, and the vendor list when `directory` """
+    invalidate([vendor_namespace(vendor_id) for vendor_id in vendor_ids] + (["vendors"] if directory else []))
@@ -0,0 +1,63 @@
+import json
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from vms.models import PurchaseOrder, VendorMetricCounters, VendorPurchaserRelationship
+
+
+def counted_purchase_orders(lookups: dict) -> int | None:
+    """ Number of purchase orders matching `lookups` (`vendor`, `purchaser`, `status`) read from the
+    maintained counters, None when no counter keeps it """
+    lookups = dict(lookups)
+    vendor_id, purchaser_id = lookups.pop("vendor", None), lookups.pop("purchaser", None)
+    status = lookups.pop("status", None)
+    if lookups:
+        return None
+    if status is None and purchaser_id is not None:
+        relationships = VendorPurchaserRelationship.objects.filter(purchaser_id=purchaser_id)
+        if vendor_id is not None:
+            relationships = relationships.filter(vendor_id=vendor_id)
+        return relationships.aggregate(count=Sum("order_count"))["count"] or 0
+    if purchaser_id is None and status in [None, PurchaseOrder.PO_DELIVERED]:
+        counters = VendorMetricCounters.objects.all()
+        if vendor_id is not None:
+            counters = counters.filter(vendor_id=vendor_id)
+        field = "issued_orders" if status is None else "completed_orders"
+        return counters.aggregate(count=Sum(field))["count"] or 0
+    return None
+
+
+def estimated_purchase_orders(queryset) -> int | None:
+    """ Row estimate of the query planner, None on backends without a usable one (SQLite) """
+    vendor = connections[queryset.db].vendor
+    queryset = queryset.order_by().values("pk")
+    if vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    elif vendor == "mysql":
+        block = json.loads(queryset.explain(format="json"))["query_block"]
+        # Rows the last table of the join order produces, subqueries (`?item=`) hang below it
+        if "nested_loop" in block:
+            table = block["nested_loop"][-1]["table"]
+        else:
+            table = block.get("table", {})
+        if "rows_produced_per_join" in table:
+            return int(table["rows_produced_per_join"])
+    return None
+
+
+def count_purchase_orders(queryset, lookups: dict) -> tuple[int, bool]:
+    """ (count, approximate) of `queryset`, exact up to `EXACT_COUNT_THRESHOLD` rows.
+
+    Above it the count comes from the counters when `lookups` are all the filters of `queryset`, from the
+    planner estimate otherwise, and is never below the rows already counted. Without either it is None.
+    """
+    threshold = settings.EXACT_COUNT_THRESHOLD
+    # Reads at most `threshold + 1` index entries, whatever the size of the listing
+    count = queryset.order_by().values("pk")[:threshold + 1].count()
+    if count <= threshold:
+        return count, False
+    estimate = counted_purchase_orders(lookups)
+    if estimate is None:
+        estimate = estimated_purchase_orders(queryset)
+    return (max(estimate, count) if estimate is not None else None), True
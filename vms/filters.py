@@ -1,14 +1,47 @@
-from django_filters.rest_framework import FilterSet
+from django.db.models import Q
+from django.utils import timezone
+from django_filters.rest_framework import BooleanFilter, CharFilter, ChoiceFilter, DateTimeFromToRangeFilter, FilterSet
+from vms.items import search_purchase_orders
 from vms.models import PurchaseOrder
+from vms.utils import get_profile_id
 
 
-class VendorFilter(FilterSet):
+class PurchaseOrderFilter(FilterSet):
+    """ Every filter, alone or combined, is backed by a `PurchaseOrder` index for each scope
+    (vendor, purchaser and admin), see `vms.tests.test_query_plans` """
+    status = ChoiceFilter(choices=PurchaseOrder.PO_STATUS)
+    # `?ordered_date_after=` / `?ordered_date_before=`, both inclusive
+    ordered_date = DateTimeFromToRangeFilter()
+    expected_delivery_date = DateTimeFromToRangeFilter()
+    overdue = BooleanFilter(method="filter_overdue",
+                            label="Pending orders past their expected delivery date")
+    item = CharFilter(method="filter_item", label="Item name words (or their prefixes)")
+
+    class Meta:
+        model = PurchaseOrder
+        fields = []
+
+    def filter_overdue(self, queryset, name, value):
+        overdue = Q(status=PurchaseOrder.PO_PENDING, expected_delivery_date__lt=timezone.now())
+        return queryset.filter(overdue) if value else queryset.exclude(overdue)
+
+    def filter_item(self, queryset, name, value):
+        user = self.request.user
+        scope = {}
+        if user.account_type == "V":
+            scope["vendor_id"] = get_profile_id(user)
+        elif user.account_type == "P":
+            scope["purchaser_id"] = get_profile_id(user)
+        return search_purchase_orders(queryset, value, **scope)
+
+
+class VendorFilter(PurchaseOrderFilter):
     class Meta:
         model = PurchaseOrder
         fields = ["vendor"]
 
 
-class PurchaserFilter(FilterSet):
+class PurchaserFilter(PurchaseOrderFilter):
     class Meta:
         model = PurchaseOrder
         fields = ["purchaser"]
@@ -0,0 +1,104 @@
+import re
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from vms.models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemToken
+
+
+BACKFILL_CHUNK_SIZE = 1000
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TOKEN_MAX_LENGTH = 64
+# Words matching at least as many orders are searched by probing the orders instead of collecting their matches
+SEARCH_COMMON_TOKEN_ORDERS = 1000
+
+
+def tokenize(text: str) -> list[str]:
+    """ Distinct case folded words of `text`, in order """
+    return list(dict.fromkeys(token[:TOKEN_MAX_LENGTH] for token in TOKEN_PATTERN.findall(text.casefold())))
+
+
+def token_prefix_filter(prefix: str) -> Q:
+    """ Tokens starting with `prefix`, as a range every backend answers from a plain b-tree index (unlike `LIKE`) """
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(token__gte=prefix, token__lt=upper_bound)
+
+
+def search_purchase_orders(queryset, text: str, **scope):
+    """ Orders of `queryset` holding, for every word of `text`, an item word starting with it.
+
+    `scope` (`vendor_id` or `purchaser_id`) narrows the token lookups to the index of the caller. The rarest
+    word drives the search, the orders holding it are probed for the other words. When every word is common
+    the orders are probed in the order of `queryset` instead, the first page is found without collecting them all.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return queryset.none()
+    matches = {token: PurchaseOrderItemToken.objects.filter(token_prefix_filter(token), **scope)
+               for token in tokens}
+    counts = {token: matches[token][:SEARCH_COMMON_TOKEN_ORDERS].count()
+              for token in tokens} if len(tokens) > 1 else {}
+    rarest = min(tokens, key=lambda token: counts.get(token, 0))
+    if counts.get(rarest, 0) < SEARCH_COMMON_TOKEN_ORDERS:
+        queryset = queryset.filter(
+            pk__in=matches.pop(rarest).values("purchase_order_id"))
+    for token_matches in matches.values():
+        queryset = queryset.filter(
+            Exists(token_matches.filter(purchase_order_id=OuterRef("pk"))))
+    return queryset
+
+
+def build_line_items(purchase_order_id: int, vendor_id: int, items: list[dict]) -> list[PurchaseOrderItem]:
+    return [PurchaseOrderItem(
+        purchase_order_id=purchase_order_id,
+        vendor_id=vendor_id,
+        # Orders stored before `maxLength` was part of the items schema may hold longer names
+        item=item["item"][:255],
+        quantity=item["quantity"],
+        unit_price=Decimal(str(item["unit_price"])) if item.get("unit_price") is not None else None)
+        for item in items]
+
+
+def build_item_tokens(purchase_order_id: int, vendor_id: int, purchaser_id: int, items: list[dict]) -> list[PurchaseOrderItemToken]:
+    return [PurchaseOrderItemToken(purchase_order_id=purchase_order_id, vendor_id=vendor_id, purchaser_id=purchaser_id, token=token)
+            for token in tokenize(" ".join(item["item"] for item in items))]
+
+
+def write_line_items(rows: list[tuple[int, int, int, list[dict]]], replace: bool) -> None:
+    """ Writes the line items and item tokens of `(id, vendor_id, purchaser_id, items)` order rows """
+    if replace:
+        purchase_order_ids = [row[0] for row in rows]
+        PurchaseOrderItem.objects.filter(
+            purchase_order_id__in=purchase_order_ids).delete()
+        PurchaseOrderItemToken.objects.filter(
+            purchase_order_id__in=purchase_order_ids).delete()
+    PurchaseOrderItem.objects.bulk_create([
+        line_item for pk, vendor_id, _, items in rows
+        for line_item in build_line_items(pk, vendor_id, items)])
+    PurchaseOrderItemToken.objects.bulk_create([
+        item_token for row in rows for item_token in build_item_tokens(*row)])
+
+
+def save_line_items(purchase_orders: list[PurchaseOrder], replace: bool = False) -> None:
+    """ Writes the line items (and item tokens) of the orders from their `items`, replacing the existing ones when `replace` """
+    with transaction.atomic(savepoint=False):
+        write_line_items([(purchase_order.pk, purchase_order.vendor_id, purchase_order.purchaser_id, purchase_order.items)
+                          for purchase_order in purchase_orders], replace)
+
+
+def backfill_line_items(chunk_size: int = BACKFILL_CHUNK_SIZE, after_id: int = 0):
+    """ Rewrites the line items (and item tokens) of every order with an id above `after_id`, one transaction per chunk of orders.
+
+    Yields the last order id of every chunk, a stopped backfill resumes from it.
+    """
+    while True:
+        rows = list(PurchaseOrder.objects
+                    .filter(pk__gt=after_id)
+                    .order_by("pk")
+                    .values_list("pk", "vendor_id", "purchaser_id", "items")[:chunk_size])
+        if not rows:
+            return
+        with transaction.atomic():
+            write_line_items(rows, replace=True)
+        after_id = rows[-1][0]
+        yield after_id
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from vms.items import backfill_line_items
+
+
+class Command(BaseCommand):
+    help = "Writes the purchase order line items (PurchaseOrderItem) from the items JSON of the existing purchase orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--after-id", type=int, default=0,
+                            help="Resume after this purchase order id")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Purchase orders read and written back per transaction")
+
+    def handle(self, *args, **options):
+        chunks = 0
+        for last_id in backfill_line_items(options["chunk_size"], options["after_id"]):
+            chunks += 1
+            self.stdout.write(f"Backfilled up to purchase order {last_id}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled the line items of {chunks} chunks of purchase orders"))
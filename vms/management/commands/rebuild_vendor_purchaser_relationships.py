@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from vms.relationships import rebuild_vendor_purchaser_relationships
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the vendor / purchaser relationships (the vendor scoped purchaser listing) from the purchase order history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor_ids", nargs="*", type=int,
+                            help="Vendors to rebuild, defaults to every vendor")
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_vendor_purchaser_relationships(
+            options["vendor_ids"] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rebuilt} vendor purchaser relationships"))
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from vms.metrics import rebuild_vendor_metric_counter_chunks
+
+
+class Command(BaseCommand):
+    help = "Recomputes the metric counters and performance metrics of every (or the given) vendor from a single grouped aggregate over the purchase orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor_ids", nargs="*", type=int,
+                            help="Vendors to recompute, defaults to every vendor (of the range)")
+        parser.add_argument("--from-vendor", type=int,
+                            help="Lowest vendor id to recompute")
+        parser.add_argument("--to-vendor", type=int,
+                            help="Highest vendor id to recompute")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Vendors written back per transaction")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Compute the metrics without writing them")
+
+    def handle(self, *args, **options):
+        vendor_range = {}
+        if options["vendor_ids"]:
+            vendor_range["in"] = options["vendor_ids"]
+        if options["from_vendor"] is not None:
+            vendor_range["gte"] = options["from_vendor"]
+        if options["to_vendor"] is not None:
+            vendor_range["lte"] = options["to_vendor"]
+
+        started_at = time.monotonic()
+        recomputed = 0
+        for chunk in rebuild_vendor_metric_counter_chunks(vendor_range, options["batch_size"], options["dry_run"]):
+            recomputed += len(chunk)
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(
+                f"{recomputed} vendors recomputed up to vendor {chunk[-1].vendor_id} "
+                f"({recomputed / elapsed if elapsed else 0:.0f} vendors/s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Computed' if options['dry_run'] else 'Recomputed'} metrics for {recomputed} vendors "
+            f"in {time.monotonic() - started_at:.2f}s"))
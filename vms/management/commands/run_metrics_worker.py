@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from vms.metrics import process_vendor_metrics_jobs
+
+
+class Command(BaseCommand):
+    help = "Recomputes the metrics of vendors queued by purchase order events (see VENDOR_METRICS_ASYNC)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100,
+                            help="Vendors recomputed per transaction")
+        parser.add_argument("--interval", type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the queue and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_vendor_metrics_jobs(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Recomputed metrics for {processed} vendors")
+            elif options["once"]:
+                break
+            else:
+                time.sleep(options["interval"])
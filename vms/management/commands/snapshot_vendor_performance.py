@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from vms.performance import prune_vendor_performance, rollup_vendor_performance, snapshot_vendor_performance
+
+
+class Command(BaseCommand):
+    help = "Snapshots the metrics of active vendors into HistoricalPerformance, rolls the snapshots up and prunes old ones. Schedule it (e.g. cron) at the snapshot interval"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-days", type=int, default=settings.PERFORMANCE_SNAPSHOT_RETENTION_DAYS,
+                            help="Prune rolled up snapshots older than this")
+        parser.add_argument("--no-snapshot", action="store_true",
+                            help="Only roll up and prune the existing snapshots")
+
+    def handle(self, *args, **options):
+        if not options["no_snapshot"]:
+            snapshots = snapshot_vendor_performance()
+            self.stdout.write(f"Recorded {snapshots} vendor snapshots")
+        rolled_up = rollup_vendor_performance()
+        self.stdout.write(f"Rolled up {rolled_up} snapshots")
+        pruned = prune_vendor_performance(options["retention_days"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {pruned} snapshots older than {options['retention_days']} days"))
@@ -0,0 +1,248 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+from django.db import connection, transaction
+from django.utils import timezone
+from django.db.models import Count, Sum, Q, F, OuterRef, Subquery, FloatField
+from django.db.models.functions import Cast, NullIf, Round
+from vms.cache import invalidate_vendors
+from vms.models import PurchaseOrder, Vendor, VendorMetricCounters, VendorMetricsJob
+from vms.utils import *
+
+
+METRIC_FIELDS = ["on_time_delivery_rate", "quality_rating_avg",
+                 "average_response_time", "fulfillment_rate"]
+
+COUNTER_FIELDS = ["issued_orders", "completed_orders", "on_time_orders",
+                  "quality_rating_sum", "quality_rating_count",
+                  "response_time_sum", "response_time_count"]
+
+REBUILD_CHUNK_SIZE = 1000
+
+# Vendor metrics which has to be refreshed when a counter changes
+AFFECTED_METRICS = {
+    "issued_orders": ["fulfillment_rate"],
+    "completed_orders": ["on_time_delivery_rate", "fulfillment_rate"],
+    "on_time_orders": ["on_time_delivery_rate"],
+    "quality_rating_sum": ["quality_rating_avg"],
+    "quality_rating_count": ["quality_rating_avg"],
+    "response_time_sum": ["average_response_time"],
+    "response_time_count": ["average_response_time"],
+}
+
+
+def counter_aggregates() -> dict:
+    """ Conditional aggregates computing every counter in a single pass over the purchase orders """
+    delivered = Q(status=PurchaseOrder.PO_DELIVERED)
+    acknowledged = Q(response_time__isnull=False)
+    return {
+        "issued_orders": Count("id"),
+        "completed_orders": Count("id", filter=delivered),
+        "on_time_orders": Count("id", filter=delivered & Q(
+            expected_delivery_date__date__gte=F("actual_delivered_date__date"))),
+        "quality_rating_sum": Sum("quality_rating", filter=delivered),
+        "quality_rating_count": Count("quality_rating", filter=delivered),
+        "response_time_sum": Sum("response_time", filter=acknowledged),
+        "response_time_count": Count("id", filter=acknowledged),
+    }
+
+
+def normalize_counters(aggregated_result: dict) -> dict:
+    counters = {field: aggregated_result.get(field) or 0
+                for field in COUNTER_FIELDS}
+    if isinstance(counters["response_time_sum"], timedelta):
+        counters["response_time_sum"] = counters["response_time_sum"].total_seconds()
+    return counters
+
+
+def metric_expressions() -> dict:
+    """ SQL counterparts of `metrics_from_counters`, evaluated against `VendorMetricCounters` """
+    return {
+        "on_time_delivery_rate": Cast(F("on_time_orders"), FloatField()) * settings.RATING_BASE_VALUE / NullIf(F("completed_orders"), 0),
+        "quality_rating_avg": F("quality_rating_sum") / NullIf(F("quality_rating_count"), 0),
+        "average_response_time": Round(F("response_time_sum") / NullIf(F("response_time_count"), 0) / (60 * 60 * 24), 1),
+        "fulfillment_rate": Cast(F("completed_orders"), FloatField()) * settings.RATING_BASE_VALUE / NullIf(F("issued_orders"), 0),
+    }
+
+
+def metric_subqueries(metrics: list[str]) -> dict[str, Subquery]:
+    """ Vendor `UPDATE` values deriving the given metrics from the vendor's counters """
+    counters = VendorMetricCounters.objects.filter(vendor_id=OuterRef("pk"))
+    expressions = metric_expressions()
+    return {metric: Subquery(counters.values(value=expressions[metric])) for metric in metrics}
+
+
+def purchase_order_counters(purchase_order: PurchaseOrder) -> dict[str, int | float]:
+    """ Contribution of a single purchase order to its vendor counters, mirrors `counter_aggregates` """
+    counters = dict.fromkeys(COUNTER_FIELDS, 0)
+    counters["issued_orders"] = 1
+    if purchase_order.status == PurchaseOrder.PO_DELIVERED:
+        counters["completed_orders"] = 1
+        if purchase_order.expected_delivery_date and purchase_order.actual_delivered_date:
+            counters["on_time_orders"] = int(
+                purchase_order.expected_delivery_date.date() >= purchase_order.actual_delivered_date.date())
+        if purchase_order.quality_rating is not None:
+            counters["quality_rating_sum"] = purchase_order.quality_rating
+            counters["quality_rating_count"] = 1
+    if purchase_order.response_time is not None:
+        counters["response_time_sum"] = purchase_order.response_time.total_seconds()
+        counters["response_time_count"] = 1
+    return counters
+
+
+def rebuild_vendor_metric_counters(vendor_ids: list[int] | None = None) -> int:
+    """ Recomputes the counters from the purchase order history and re-derives the vendor metrics """
+    vendor_range = {"in": vendor_ids} if vendor_ids is not None else {}
+    return sum(len(chunk) for chunk in rebuild_vendor_metric_counter_chunks(vendor_range))
+
+
+def rebuild_vendor_metric_counter_chunks(vendor_range: dict, chunk_size: int = REBUILD_CHUNK_SIZE, dry_run: bool = False):
+    """ Recomputes the counters of the vendors whose id matches the `vendor_range` lookups (e.g. `{"gte": 1, "lte": 500}`,
+    `{"in": [...]}`, `{}` for every vendor) from a single grouped aggregate over their purchase orders.
+
+    Writes them back (unless `dry_run`) and yields them `chunk_size` vendors at a time, memory stays bound by one chunk.
+    """
+    purchase_orders = PurchaseOrder.objects.filter(
+        **{f"vendor_id__{lookup}": value for lookup, value in vendor_range.items()})
+    vendor_ids = Vendor.objects \
+        .filter(**{f"pk__{lookup}": value for lookup, value in vendor_range.items()}) \
+        .order_by("pk") \
+        .values_list("pk", flat=True) \
+        .iterator(chunk_size=chunk_size)
+    # Vendors whose orders all went to other vendors are reset as well
+    counters = vendor_metric_counters(vendor_ids, purchase_orders, chunk_size)
+    while chunk := list(islice(counters, chunk_size)):
+        if not dry_run:
+            save_vendor_metric_counters(chunk)
+        yield chunk
+
+
+def aggregate_vendor_metric_counters(purchase_orders, chunk_size: int = REBUILD_CHUNK_SIZE):
+    """ Streams the counters of every vendor in `purchase_orders` from a single grouped aggregate, ordered by vendor """
+    aggregated_results = purchase_orders \
+        .values("vendor_id") \
+        .annotate(**counter_aggregates()) \
+        .order_by("vendor_id") \
+        .iterator(chunk_size=chunk_size)
+    for aggregated_result in aggregated_results:
+        yield VendorMetricCounters(vendor_id=aggregated_result["vendor_id"], **normalize_counters(aggregated_result))
+
+
+def vendor_metric_counters(vendor_ids, purchase_orders, chunk_size: int = REBUILD_CHUNK_SIZE):
+    """ Streams the counters of every vendor of `vendor_ids` (ascending), zeroed for vendors left without purchase orders """
+    aggregated_counters = aggregate_vendor_metric_counters(purchase_orders, chunk_size)
+    counters = next(aggregated_counters, None)
+    for vendor_id in vendor_ids:
+        while counters is not None and counters.vendor_id < vendor_id:
+            counters = next(aggregated_counters, None)
+        if counters is not None and counters.vendor_id == vendor_id:
+            yield counters
+        else:
+            yield VendorMetricCounters(vendor_id=vendor_id)
+
+
+def save_vendor_metric_counters(counters: list[VendorMetricCounters]) -> None:
+    """ Upserts recomputed counters and re-derives the metrics of their vendors """
+    vendor_ids = [vendor_counters.vendor_id for vendor_counters in counters]
+    with transaction.atomic():
+        VendorMetricCounters.objects.bulk_create(
+            counters, update_conflicts=True, unique_fields=conflict_target(["vendor"]), update_fields=COUNTER_FIELDS)
+        Vendor.objects \
+            .filter(pk__in=vendor_ids) \
+            .update(version=F("version") + 1, **metric_subqueries(METRIC_FIELDS))
+        invalidate_vendors(vendor_ids)
+
+
+def seed_vendor_metric_counters(vendor_ids: list[int]) -> None:
+    """ Inserts zeroed counters for the vendors which have none yet """
+    VendorMetricCounters.objects.bulk_create(
+        [VendorMetricCounters(vendor_id=vendor_id) for vendor_id in vendor_ids], ignore_conflicts=True)
+
+
+def update_vendor_metrics(vendor_id: int, **deltas: int | float) -> None:
+    """ Applies counter deltas and refreshes only the affected vendor metrics, in two UPDATE statements """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    with transaction.atomic(savepoint=False):
+        updated = VendorMetricCounters.objects.filter(vendor_id=vendor_id).update(**increments)
+        if not updated:
+            # Counters are seeded with the vendor, a concurrent seed of a missing row is ignored
+            # and every event still lands as an increment
+            seed_vendor_metric_counters([vendor_id])
+            VendorMetricCounters.objects.filter(vendor_id=vendor_id).update(**increments)
+        affected_metrics = {metric for field in deltas
+                            for metric in AFFECTED_METRICS[field]}
+        Vendor.objects.filter(pk=vendor_id).update(
+            version=F("version") + 1, **metric_subqueries(sorted(affected_metrics)))
+        invalidate_vendors([vendor_id])
+
+
+def enqueue_vendor_metrics(vendor_ids: list[int]) -> None:
+    """ Marks the vendors dirty, repeated events of a vendor coalesce into its single pending job """
+    enqueued_at = timezone.now()
+    VendorMetricsJob.objects.bulk_create(
+        [VendorMetricsJob(vendor_id=vendor_id, enqueued_at=enqueued_at)
+         for vendor_id in set(vendor_ids)],
+        update_conflicts=True, unique_fields=conflict_target(["vendor"]), update_fields=["enqueued_at"])
+
+
+def process_vendor_metrics_jobs(batch_size: int = 100) -> int:
+    """ Recomputes the metrics of a batch of dirty vendors, returns the number of vendors processed.
+
+    Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several workers can share the queue.
+    On backends without row locks (SQLite) writers are serialized anyway, run a single worker there.
+    """
+    with transaction.atomic():
+        jobs = list(VendorMetricsJob.objects
+                    .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+                    .order_by("enqueued_at")[:batch_size])
+        if not jobs:
+            return 0
+        rebuild_vendor_metric_counters([job.vendor_id for job in jobs])
+        processed_jobs = Q()
+        for job in jobs:
+            processed_jobs |= Q(vendor_id=job.vendor_id,
+                                enqueued_at=job.enqueued_at)
+        VendorMetricsJob.objects.filter(processed_jobs).delete()
+    return len(jobs)
+
+
+def record_purchase_order_change(purchase_order: PurchaseOrder, previous_counters: dict[str, int | float] | None = None, previous_vendor_id: int | None = None) -> None:
+    """ Folds a purchase order transition into its vendor counters, `previous_counters` is None for new orders """
+    if settings.VENDOR_METRICS_ASYNC:
+        transaction.on_commit(partial(enqueue_vendor_metrics, [
+            vendor_id for vendor_id in (previous_vendor_id, purchase_order.vendor_id) if vendor_id]))
+        return
+
+    current_counters = purchase_order_counters(purchase_order)
+    previous_counters = previous_counters or dict.fromkeys(COUNTER_FIELDS, 0)
+    if previous_vendor_id and previous_vendor_id != purchase_order.vendor_id:
+        # Reassigned to another vendor, move the whole contribution across
+        update_vendor_metrics(previous_vendor_id, **{
+            field: -previous_counters[field] for field in COUNTER_FIELDS
+        })
+        previous_counters = dict.fromkeys(COUNTER_FIELDS, 0)
+    update_vendor_metrics(purchase_order.vendor_id, **{
+        field: current_counters[field] - previous_counters[field] for field in COUNTER_FIELDS
+    })
+
+
+def record_purchase_order_changes(purchase_orders: list[PurchaseOrder], previous_counters: list[dict[str, int | float]] | None = None) -> None:
+    """ Folds a batch of purchase order transitions into the counters with one update per vendor,
+    `previous_counters` (one per order) is None for new orders """
+    vendor_ids = sorted({purchase_order.vendor_id for purchase_order in purchase_orders})
+    if settings.VENDOR_METRICS_ASYNC:
+        transaction.on_commit(partial(enqueue_vendor_metrics, vendor_ids))
+        return
+
+    deltas = defaultdict(Counter)
+    for index, purchase_order in enumerate(purchase_orders):
+        current_counters = purchase_order_counters(purchase_order)
+        for field in COUNTER_FIELDS:
+            deltas[purchase_order.vendor_id][field] += current_counters[field] - \
+                (previous_counters[index][field] if previous_counters else 0)
+    for vendor_id in vendor_ids:
+        update_vendor_metrics(vendor_id, **deltas[vendor_id])
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0004_historicalperformance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorMetricCounters',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metric_counters', serialize=False, to='vms.vendor')),
+                ('issued_orders', models.PositiveIntegerField(default=0)),
+                ('completed_orders', models.PositiveIntegerField(default=0)),
+                ('on_time_orders', models.PositiveIntegerField(default=0)),
+                ('quality_rating_sum', models.FloatField(default=0)),
+                ('quality_rating_count', models.PositiveIntegerField(default=0)),
+                ('response_time_sum', models.FloatField(default=0)),
+                ('response_time_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
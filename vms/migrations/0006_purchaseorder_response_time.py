@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+from django.db import migrations, models
+from django.db.models import F, ExpressionWrapper, DurationField
+
+
+def populate_response_time(apps, schema_editor):
+    PurchaseOrder = apps.get_model("vms", "PurchaseOrder")
+    PurchaseOrder.objects \
+        .filter(acknowledged_date__isnull=False, issued_date__isnull=False) \
+        .update(response_time=ExpressionWrapper(F("acknowledged_date") - F("issued_date"), output_field=DurationField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0005_vendormetriccounters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='response_time',
+            field=models.DurationField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['vendor', 'acknowledged_date'], name='vms_po_vendor_ack_idx'),
+        ),
+        migrations.RunPython(populate_response_time,
+                             migrations.RunPython.noop),
+    ]
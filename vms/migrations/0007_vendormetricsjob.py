@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0006_purchaseorder_response_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorMetricsJob',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics_job', serialize=False, to='vms.vendor')),
+                ('enqueued_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0007_vendormetricsjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalperformance',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='PerformanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('D', 'Day'), ('W', 'Week'), ('M', 'Month')], max_length=1)),
+                ('bucket_start', models.DateTimeField()),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('on_time_delivery_rate_sum', models.FloatField(default=0)),
+                ('on_time_delivery_rate_count', models.PositiveIntegerField(default=0)),
+                ('quality_rating_avg_sum', models.FloatField(default=0)),
+                ('quality_rating_avg_count', models.PositiveIntegerField(default=0)),
+                ('average_response_time_sum', models.FloatField(default=0)),
+                ('average_response_time_count', models.PositiveIntegerField(default=0)),
+                ('fulfillment_rate_sum', models.FloatField(default=0)),
+                ('fulfillment_rate_count', models.PositiveIntegerField(default=0)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='vms.vendor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'period', 'bucket_start'), name='vms_rollup_vendor_bucket_uniq')],
+            },
+        ),
+    ]
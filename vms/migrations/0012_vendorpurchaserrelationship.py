@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Max
+
+
+def populate_relationships(apps, schema_editor):
+    PurchaseOrder = apps.get_model("vms", "PurchaseOrder")
+    VendorPurchaserRelationship = apps.get_model(
+        "vms", "VendorPurchaserRelationship")
+    aggregated_results = PurchaseOrder.objects \
+        .values("vendor_id", "purchaser_id") \
+        .annotate(first_ordered_date=Min("ordered_date"), last_ordered_date=Max("ordered_date"), order_count=Count("id")) \
+        .order_by("vendor_id", "purchaser_id")
+    VendorPurchaserRelationship.objects.bulk_create(
+        (VendorPurchaserRelationship(**aggregated_result) for aggregated_result in aggregated_results.iterator(chunk_size=1000)),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0011_vendor_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorPurchaserRelationship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_ordered_date', models.DateTimeField()),
+                ('last_ordered_date', models.DateTimeField()),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('purchaser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendor_relationships', to='vms.purchaser')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchaser_relationships', to='vms.vendor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'purchaser'), name='vms_relationship_vendor_purchaser_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_relationships,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0012_vendorpurchaserrelationship'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item', models.CharField(max_length=255)),
+                ('quantity', models.PositiveIntegerField()),
+                ('unit_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='line_items', to='vms.purchaseorder')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vms.vendor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'vendor'], name='vms_po_item_item_vendor_idx')],
+            },
+        ),
+    ]
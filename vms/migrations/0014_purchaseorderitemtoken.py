@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0013_purchaseorderitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderItemToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_tokens', to='vms.purchaseorder')),
+                ('purchaser', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vms.purchaser')),
+                ('vendor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vms.vendor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token'], name='vms_po_token_idx'), models.Index(fields=['vendor', 'token'], name='vms_po_token_vendor_idx'), models.Index(fields=['purchaser', 'token'], name='vms_po_token_purchaser_idx')],
+            },
+        ),
+    ]
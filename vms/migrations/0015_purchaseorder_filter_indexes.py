@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0014_purchaseorderitemtoken'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchaseorder',
+            name='vms_po_vendor_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='purchaseorder',
+            name='vms_po_vendor_ack_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='purchaseorder',
+            name='vms_po_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='purchaser',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='orders', to='vms.purchaser'),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='vendor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='orders', to='vms.vendor'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['vendor', 'status', 'ordered_date'], name='vms_po_vendor_status_ord_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['purchaser', 'status', 'ordered_date'], name='vms_po_purch_status_ord_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['ordered_date'], name='vms_po_ordered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['expected_delivery_date'], name='vms_po_expected_idx'),
+        ),
+    ]
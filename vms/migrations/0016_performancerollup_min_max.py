@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0015_purchaseorder_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performancerollup',
+            name='average_response_time_max',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='average_response_time_min',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='fulfillment_rate_max',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='fulfillment_rate_min',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='on_time_delivery_rate_max',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='on_time_delivery_rate_min',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='quality_rating_avg_max',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='performancerollup',
+            name='quality_rating_avg_min',
+            field=models.FloatField(null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+
+
+def populate_vendor_metric_counters(apps, schema_editor):
+    """ Counters of the vendors 0005 left without any, from their purchase order history """
+    Vendor = apps.get_model("vms", "Vendor")
+    PurchaseOrder = apps.get_model("vms", "PurchaseOrder")
+    VendorMetricCounters = apps.get_model("vms", "VendorMetricCounters")
+    delivered = Q(status="D")
+    acknowledged = Q(response_time__isnull=False)
+    aggregated_results = PurchaseOrder.objects \
+        .filter(vendor__metric_counters__isnull=True) \
+        .values("vendor_id") \
+        .annotate(issued_orders=Count("id"),
+                  completed_orders=Count("id", filter=delivered),
+                  on_time_orders=Count("id", filter=delivered & Q(
+                      expected_delivery_date__date__gte=F("actual_delivered_date__date"))),
+                  quality_rating_sum=Sum("quality_rating", filter=delivered),
+                  quality_rating_count=Count("quality_rating", filter=delivered),
+                  response_time_sum=Sum("response_time", filter=acknowledged),
+                  response_time_count=Count("id", filter=acknowledged)) \
+        .order_by("vendor_id")
+    counters = {vendor_id: VendorMetricCounters(vendor_id=vendor_id) for vendor_id in Vendor.objects
+                .filter(metric_counters__isnull=True).values_list("pk", flat=True)}
+    for aggregated_result in aggregated_results.iterator(chunk_size=1000):
+        vendor_id = aggregated_result.pop("vendor_id")
+        response_time_sum = aggregated_result.pop("response_time_sum") or 0
+        if isinstance(response_time_sum, timedelta):
+            response_time_sum = response_time_sum.total_seconds()
+        counters[vendor_id] = VendorMetricCounters(
+            vendor_id=vendor_id, response_time_sum=response_time_sum,
+            **{field: value or 0 for field, value in aggregated_result.items()})
+    VendorMetricCounters.objects.bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vms', '0016_performancerollup_min_max'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_vendor_metric_counters,
+                             migrations.RunPython.noop),
+    ]
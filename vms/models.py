@@ -22,6 +22,17 @@ class Vendor(CommonInfo):
     quality_rating_avg = models.FloatField(null=True, blank=True)
     average_response_time = models.FloatField(null=True, blank=True)
     fulfillment_rate = models.FloatField(null=True, blank=True)
+    # Bumped on every profile or metric change, the ETag of the vendor endpoints
+    version = models.PositiveIntegerField(default=1)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        self.version = models.F("version") + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=["version"])
 
 
 class Purchaser(CommonInfo):
@@ -38,10 +49,11 @@ class PurchaseOrder(models.Model):
         (PO_DELIVERED, "Delivered")
     ]
 
+    # Leading column of the composite indexes in `Meta`, which serve the plain lookups too
     vendor = models.ForeignKey(
-        Vendor, on_delete=models.DO_NOTHING, related_name="orders")
+        Vendor, on_delete=models.DO_NOTHING, related_name="orders", db_index=False)
     purchaser = models.ForeignKey(
-        Purchaser, on_delete=models.DO_NOTHING, related_name="orders")
+        Purchaser, on_delete=models.DO_NOTHING, related_name="orders", db_index=False)
     items = models.JSONField(null=False, blank=False)
     quantity = models.PositiveIntegerField(
         validators=[validators.MinValueValidator(1)])
@@ -59,6 +71,129 @@ class PurchaseOrder(models.Model):
     expected_delivery_date = models.DateTimeField(null=True)
     # When an order delivered to the purchacer
     actual_delivered_date = models.DateTimeField(null=True)
+    # Time taken by the vendor to acknowledge the order (acknowledged_date - issued_date)
+    response_time = models.DurationField(null=True)
+
+    class Meta:
+        indexes = [
+            # Maintained on every transition, so only what the listings and `vms.filters.PurchaseOrderFilter` need:
+            # scoped date filters stay within the vendor / purchaser prefix, unscoped (admin) ones need the dates leading
+            models.Index(fields=["vendor", "status", "ordered_date"],
+                         name="vms_po_vendor_status_ord_idx"),
+            models.Index(fields=["vendor", "ordered_date"],
+                         name="vms_po_vendor_ordered_idx"),
+            models.Index(fields=["purchaser", "status", "ordered_date"],
+                         name="vms_po_purch_status_ord_idx"),
+            models.Index(fields=["purchaser", "ordered_date"],
+                         name="vms_po_purchaser_ordered_idx"),
+            models.Index(fields=["ordered_date"],
+                         name="vms_po_ordered_idx"),
+            models.Index(fields=["expected_delivery_date"],
+                         name="vms_po_expected_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.pk}"
+
+    def save(self, *args, **kwargs):
+        if self.acknowledged_date and self.issued_date and self.response_time is None:
+            self.response_time = self.acknowledged_date - self.issued_date
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"], "response_time"}
+        return super().save(*args, **kwargs)
+
+
+class PurchaseOrderItem(models.Model):
+    """ A line of `PurchaseOrder.items`, written alongside the JSON for item level queries """
+    purchase_order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.CASCADE, related_name="line_items")
+    # Copied from the order, item analytics group by vendor without a join
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.DO_NOTHING, related_name="+")
+    item = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["item", "vendor"],
+                         name="vms_po_item_item_vendor_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.item
+
+
+class PurchaseOrderItemToken(models.Model):
+    """ Inverted index of the item names, one row per order and word of its items (see `vms.items.tokenize`) """
+    purchase_order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.CASCADE, related_name="item_tokens")
+    # Copied from the order, a search stays within the scope of the caller in one index range
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.DO_NOTHING, related_name="+", db_index=False)
+    purchaser = models.ForeignKey(
+        Purchaser, on_delete=models.DO_NOTHING, related_name="+", db_index=False)
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["token"], name="vms_po_token_idx"),
+            models.Index(fields=["vendor", "token"],
+                         name="vms_po_token_vendor_idx"),
+            models.Index(fields=["purchaser", "token"],
+                         name="vms_po_token_purchaser_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.token
+
+
+class VendorPurchaserRelationship(models.Model):
+    """ One row per purchaser that ordered from a vendor, kept up to date as purchase orders are created """
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE, related_name="purchaser_relationships")
+    purchaser = models.ForeignKey(
+        Purchaser, on_delete=models.CASCADE, related_name="vendor_relationships")
+    first_ordered_date = models.DateTimeField()
+    last_ordered_date = models.DateTimeField()
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index of the vendor scoped purchaser listing
+            models.UniqueConstraint(
+                fields=["vendor", "purchaser"], name="vms_relationship_vendor_purchaser_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.pk}"
+
+
+class VendorMetricCounters(models.Model):
+    """ Running per-vendor totals the performance metrics are derived from """
+    vendor = models.OneToOneField(
+        Vendor, on_delete=models.CASCADE, primary_key=True, related_name="metric_counters")
+    issued_orders = models.PositiveIntegerField(default=0)
+    completed_orders = models.PositiveIntegerField(default=0)
+    on_time_orders = models.PositiveIntegerField(default=0)
+    quality_rating_sum = models.FloatField(default=0)
+    quality_rating_count = models.PositiveIntegerField(default=0)
+    # Sum of (acknowledged_date - issued_date) in seconds
+    response_time_sum = models.FloatField(default=0)
+    response_time_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.pk}"
+
+
+class VendorMetricsJob(models.Model):
+    """ Marks a vendor whose metrics has to be recomputed by the metrics worker """
+    vendor = models.OneToOneField(
+        Vendor, on_delete=models.CASCADE, primary_key=True, related_name="metrics_job")
+    # Refreshed on every enqueue, so a vendor dirtied again while being processed is picked up again
+    enqueued_at = models.DateTimeField(db_index=True)
 
     def __str__(self) -> str:
         return f"{self.pk}"
@@ -71,6 +206,58 @@ class HistoricalPerformance(models.Model):
     quality_rating_avg = models.FloatField(null=True, blank=True)
     average_response_time = models.FloatField(null=True, blank=True)
     fulfillment_rate = models.FloatField(null=True, blank=True)
+    # Whether the snapshot is folded into the PerformanceRollup buckets (and can be pruned)
+    rolled_up = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["vendor", "recorded_data"],
+                         name="vms_history_vendor_rec_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.pk}"
+
+
+class PerformanceRollup(models.Model):
+    """ Pre-aggregated HistoricalPerformance snapshots of a vendor per day, week or month """
+    PERIOD_DAY = "D"
+    PERIOD_WEEK = "W"
+    PERIOD_MONTH = "M"
+    PERIODS = [
+        (PERIOD_DAY, "Day"),
+        (PERIOD_WEEK, "Week"),
+        (PERIOD_MONTH, "Month")
+    ]
+
+    vendor = models.ForeignKey(Vendor, on_delete=models.DO_NOTHING)
+    period = models.CharField(max_length=1, choices=PERIODS)
+    bucket_start = models.DateTimeField()
+    samples = models.PositiveIntegerField(default=0)
+    # Sum and number of non null snapshot values, averages are sum / count
+    on_time_delivery_rate_sum = models.FloatField(default=0)
+    on_time_delivery_rate_count = models.PositiveIntegerField(default=0)
+    quality_rating_avg_sum = models.FloatField(default=0)
+    quality_rating_avg_count = models.PositiveIntegerField(default=0)
+    average_response_time_sum = models.FloatField(default=0)
+    average_response_time_count = models.PositiveIntegerField(default=0)
+    fulfillment_rate_sum = models.FloatField(default=0)
+    fulfillment_rate_count = models.PositiveIntegerField(default=0)
+    # Smallest and largest snapshot value, null while no value was folded in
+    on_time_delivery_rate_min = models.FloatField(null=True)
+    on_time_delivery_rate_max = models.FloatField(null=True)
+    quality_rating_avg_min = models.FloatField(null=True)
+    quality_rating_avg_max = models.FloatField(null=True)
+    average_response_time_min = models.FloatField(null=True)
+    average_response_time_max = models.FloatField(null=True)
+    fulfillment_rate_min = models.FloatField(null=True)
+    fulfillment_rate_max = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vendor", "period", "bucket_start"], name="vms_rollup_vendor_bucket_uniq"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.pk}"
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.validators import EMPTY_VALUES
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.pagination import CursorPagination
+from vms.counts import count_purchase_orders
+from vms.utils import get_profile_id
+
+
+class KeysetPagination(CursorPagination):
+    """ Opaque cursor pagination, every page is an indexed range scan (no OFFSET, no COUNT(*)) """
+    page_size_query_param = "page_size"
+    max_page_size = settings.MAX_PAGE_SIZE
+    ordering = "id"
+
+
+class PurchaseOrderPagination(KeysetPagination):
+    """ Adds `count` and `count_approximate` to the pages requested with `?count=true`, see `vms.counts` """
+    ordering = ("-ordered_date", "-id")
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = self.count_approximate = None
+        if request.query_params.get(self.count_query_param, "").lower() in ["1", "true"]:
+            self.count, self.count_approximate = count_purchase_orders(
+                queryset, self.get_count_lookups(queryset, request, view))
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_lookups(self, queryset, request, view) -> dict:
+        """ Every filter applied to `queryset`, the scope of the caller included """
+        lookups = {}
+        profile_id = get_profile_id(request.user)
+        if request.user.account_type == "V":
+            lookups["vendor"] = profile_id
+        elif request.user.account_type == "P":
+            lookups["purchaser"] = profile_id
+        filterset = DjangoFilterBackend().get_filterset(request, queryset, view)
+        if filterset is not None and filterset.is_valid():
+            for name, value in filterset.form.cleaned_data.items():
+                if value not in EMPTY_VALUES:
+                    # A filter on the scope itself either matches it or leaves nothing (counted exactly)
+                    lookups.setdefault(name, getattr(value, "pk", value))
+        return lookups
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count_approximate is not None:
+            response.data = {"count": self.count, "count_approximate": self.count_approximate,
+                             **response.data}
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": {"type": "integer", "nullable": True, "example": 123,
+                      "description": "Only with `?count=true`, null when too large to count and no estimate exists"},
+            "count_approximate": {"type": "boolean", "example": False,
+                                  "description": "Whether `count` is estimated, only with `?count=true`"},
+            **response_schema["properties"],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            "name": self.count_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Include the (possibly approximate) number of results",
+            "schema": {"type": "boolean"},
+        }]
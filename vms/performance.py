@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+from itertools import chain
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from vms.metrics import METRIC_FIELDS
+from vms.models import HistoricalPerformance, PerformanceRollup, Vendor
+
+
+ROLLUP_CHUNK_SIZE = 5000
+
+ROLLUP_SUM_FIELDS = ["samples", *(f"{metric}_{aggregate}" for metric in METRIC_FIELDS
+                                  for aggregate in ("sum", "count"))]
+
+ROLLUP_FIELDS = [*ROLLUP_SUM_FIELDS, *(f"{metric}_{aggregate}" for metric in METRIC_FIELDS
+                                       for aggregate in ("min", "max"))]
+
+
+def bucket_start(recorded_data: datetime, period: str) -> datetime:
+    day = recorded_data.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == PerformanceRollup.PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    elif period == PerformanceRollup.PERIOD_MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def snapshot_vendor_performance() -> int:
+    """ Records the current metrics of every active vendor in a single bulk insert """
+    active_vendors = Vendor.objects \
+        .filter(user__is_active=True, metric_counters__issued_orders__gt=0) \
+        .values("pk", *METRIC_FIELDS)
+    snapshots = HistoricalPerformance.objects.bulk_create(
+        [HistoricalPerformance(vendor_id=vendor.pop("pk"), **vendor) for vendor in active_vendors],
+        batch_size=ROLLUP_CHUNK_SIZE)
+    return len(snapshots)
+
+
+def rollup_vendor_performance() -> int:
+    """ Folds the snapshots not rolled up yet into the day, week and month buckets """
+    rolled_up = 0
+    while True:
+        with transaction.atomic():
+            snapshots = list(HistoricalPerformance.objects
+                             .filter(rolled_up=False)
+                             .order_by("pk")[:ROLLUP_CHUNK_SIZE])
+            if not snapshots:
+                return rolled_up
+
+            rollups = {}
+            for snapshot in snapshots:
+                for period, _ in PerformanceRollup.PERIODS:
+                    key = (snapshot.vendor_id, period, bucket_start(
+                        snapshot.recorded_data, period))
+                    if key not in rollups:
+                        rollups[key] = PerformanceRollup(
+                            vendor_id=key[0], period=key[1], bucket_start=key[2])
+                    accumulate(rollups[key], snapshot)
+
+            existing_rollups = PerformanceRollup.objects \
+                .select_for_update() \
+                .filter(vendor_id__in={key[0] for key in rollups},
+                        bucket_start__in={key[2] for key in rollups})
+            for existing_rollup in existing_rollups:
+                key = (existing_rollup.vendor_id,
+                       existing_rollup.period, existing_rollup.bucket_start)
+                if key in rollups:
+                    merge(existing_rollup, rollups[key])
+                    rollups[key] = existing_rollup
+
+            PerformanceRollup.objects.bulk_create(
+                [rollup for rollup in rollups.values() if rollup.pk is None])
+            PerformanceRollup.objects.bulk_update(
+                [rollup for rollup in rollups.values() if rollup.pk is not None], ROLLUP_FIELDS)
+            HistoricalPerformance.objects \
+                .filter(pk__in=[snapshot.pk for snapshot in snapshots]) \
+                .update(rolled_up=True)
+        rolled_up += len(snapshots)
+
+
+def prune_vendor_performance(retention_days: int) -> int:
+    """ Deletes rolled up snapshots older than `retention_days` """
+    deleted, _ = HistoricalPerformance.objects \
+        .filter(rolled_up=True, recorded_data__lt=timezone.now() - timedelta(days=retention_days)) \
+        .delete()
+    return deleted
+
+
+def accumulate(rollup: PerformanceRollup, snapshot: HistoricalPerformance) -> None:
+    rollup.samples += 1
+    for metric in METRIC_FIELDS:
+        value = getattr(snapshot, metric)
+        if value is not None:
+            setattr(rollup, f"{metric}_sum",
+                    getattr(rollup, f"{metric}_sum") + value)
+            setattr(rollup, f"{metric}_count",
+                    getattr(rollup, f"{metric}_count") + 1)
+            fold_extrema(rollup, metric, value, value)
+
+
+def merge(rollup: PerformanceRollup, other: PerformanceRollup) -> None:
+    for field in ROLLUP_SUM_FIELDS:
+        setattr(rollup, field, getattr(rollup, field) + getattr(other, field))
+    for metric in METRIC_FIELDS:
+        if getattr(other, f"{metric}_min") is not None:
+            fold_extrema(rollup, metric, getattr(other, f"{metric}_min"), getattr(other, f"{metric}_max"))
+
+
+def fold_extrema(rollup: PerformanceRollup, metric: str, minimum: float, maximum: float) -> None:
+    current_minimum, current_maximum = getattr(rollup, f"{metric}_min"), getattr(rollup, f"{metric}_max")
+    setattr(rollup, f"{metric}_min", minimum if current_minimum is None else min(current_minimum, minimum))
+    setattr(rollup, f"{metric}_max", maximum if current_maximum is None else max(current_maximum, maximum))
+
+
+def rollup_samples(vendor_id: int, **filters):
+    """ (recorded_data, samples, [(sum, count, min, max) of each metric]) of the daily rollups """
+    rows = PerformanceRollup.objects \
+        .filter(vendor_id=vendor_id, period=PerformanceRollup.PERIOD_DAY, **filters) \
+        .order_by("bucket_start") \
+        .values_list("bucket_start", "samples", *(f"{metric}_{aggregate}" for metric in METRIC_FIELDS
+                                                  for aggregate in ("sum", "count", "min", "max")))
+    for recorded_data, count, *values in rows.iterator():
+        metrics = []
+        for value_sum, value_count, minimum, maximum in zip(*[iter(values)] * 4):
+            if value_count and minimum is None:
+                # Rolled up before the extrema were kept, the daily average stands in
+                minimum = maximum = value_sum / value_count
+            metrics.append((value_sum, value_count, minimum, maximum))
+        yield recorded_data, count, metrics
+
+
+def snapshot_samples(vendor_id: int, **filters):
+    """ Raw snapshots in the shape of `rollup_samples` """
+    rows = HistoricalPerformance.objects \
+        .filter(vendor_id=vendor_id, **filters) \
+        .order_by("recorded_data") \
+        .values_list("recorded_data", *METRIC_FIELDS)
+    for recorded_data, *values in rows.iterator():
+        yield recorded_data, 1, [(value, 1, value, value) if value is not None else (0, 0, None, None)
+                                 for value in values]
+
+
+def get_performance_history(vendor_id: int, start: datetime, end: datetime, points: int) -> list[dict]:
+    """ Downsamples the vendor history between `start` and `end` into at most `points` time buckets.
+
+    Each bucket holds the average, minimum and maximum of every metric. Buckets of a day or wider
+    are read from the daily rollups, narrower ones from the raw snapshots where they are still
+    retained (see `PERFORMANCE_SNAPSHOT_RETENTION_DAYS`) and from the daily rollups before that.
+    """
+    width = (end - start) / points
+    # First day whose snapshots are all retained
+    retained_from = bucket_start(
+        timezone.now() - timedelta(days=settings.PERFORMANCE_SNAPSHOT_RETENTION_DAYS),
+        PerformanceRollup.PERIOD_DAY) + timedelta(days=1)
+    if width >= timedelta(days=1):
+        samples = rollup_samples(vendor_id, bucket_start__range=(start, end))
+    elif start >= retained_from:
+        samples = snapshot_samples(vendor_id, recorded_data__range=(start, end))
+    else:
+        samples = chain(
+            rollup_samples(vendor_id, bucket_start__gte=start, bucket_start__lt=min(end, retained_from)),
+            snapshot_samples(vendor_id, recorded_data__gte=retained_from, recorded_data__lte=end))
+
+    buckets = {}
+    for recorded_data, count, values in samples:
+        index = min(int((recorded_data - start) / width), points - 1)
+        if index not in buckets:
+            buckets[index] = {"recorded_data": start + index * width, "samples": 0,
+                              **{metric: [0, 0, None, None] for metric in METRIC_FIELDS}}
+        bucket = buckets[index]
+        bucket["samples"] += count
+        for metric, (value_sum, value_count, value_min, value_max) in zip(METRIC_FIELDS, values):
+            if value_count:
+                total, weight, minimum, maximum = bucket[metric]
+                bucket[metric] = [total + value_sum, weight + value_count,
+                                  value_min if minimum is None else min(minimum, value_min),
+                                  value_max if maximum is None else max(maximum, value_max)]
+
+    history = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        point = {"recorded_data": bucket["recorded_data"],
+                 "samples": bucket["samples"]}
+        for metric in METRIC_FIELDS:
+            total, weight, minimum, maximum = bucket[metric]
+            point[metric] = total / weight if weight else None
+            point[f"{metric}_min"] = minimum
+            point[f"{metric}_max"] = maximum
+        history.append(point)
+    return history
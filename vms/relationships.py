@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models import Count, Min, Max, F, Value
+from django.db.models.functions import Greatest, Least
+from vms.models import PurchaseOrder, VendorPurchaserRelationship
+
+
+REBUILD_CHUNK_SIZE = 1000
+
+
+def aggregate_vendor_purchaser_relationships(purchase_orders, chunk_size: int = REBUILD_CHUNK_SIZE):
+    """ Streams one relationship per (vendor, purchaser) pair in `purchase_orders` from a single grouped aggregate """
+    aggregated_results = purchase_orders \
+        .values("vendor_id", "purchaser_id") \
+        .annotate(first_ordered_date=Min("ordered_date"), last_ordered_date=Max("ordered_date"), order_count=Count("id")) \
+        .order_by("vendor_id", "purchaser_id") \
+        .iterator(chunk_size=chunk_size)
+    for aggregated_result in aggregated_results:
+        yield VendorPurchaserRelationship(**aggregated_result)
+
+
+def rebuild_vendor_purchaser_relationships(vendor_ids: list[int] | None = None, purchaser_ids: list[int] | None = None) -> int:
+    """ Recomputes the relationships of the vendors (and purchasers) from the purchase order history """
+    relationships = VendorPurchaserRelationship.objects.all()
+    purchase_orders = PurchaseOrder.objects.all()
+    if vendor_ids is not None:
+        relationships = relationships.filter(vendor_id__in=vendor_ids)
+        purchase_orders = purchase_orders.filter(vendor_id__in=vendor_ids)
+    if purchaser_ids is not None:
+        relationships = relationships.filter(purchaser_id__in=purchaser_ids)
+        purchase_orders = purchase_orders.filter(
+            purchaser_id__in=purchaser_ids)
+
+    rebuilt, chunk = 0, []
+    with transaction.atomic():
+        # Pairs left without orders (every order reassigned) disappear
+        relationships.delete()
+        for relationship in aggregate_vendor_purchaser_relationships(purchase_orders):
+            chunk.append(relationship)
+            if len(chunk) == REBUILD_CHUNK_SIZE:
+                rebuilt += len(VendorPurchaserRelationship.objects.bulk_create(chunk))
+                chunk = []
+        rebuilt += len(VendorPurchaserRelationship.objects.bulk_create(chunk))
+    return rebuilt
+
+
+def record_vendor_purchaser_orders(purchase_orders: list[PurchaseOrder]) -> None:
+    """ Folds new purchase orders into the relationships of their vendors and purchasers, one UPDATE per pair """
+    pairs = {}
+    for purchase_order in purchase_orders:
+        pair = (purchase_order.vendor_id, purchase_order.purchaser_id)
+        order_count, first_ordered_date, last_ordered_date = pairs.get(
+            pair, (0, purchase_order.ordered_date, purchase_order.ordered_date))
+        pairs[pair] = (order_count + 1,
+                       min(first_ordered_date, purchase_order.ordered_date),
+                       max(last_ordered_date, purchase_order.ordered_date))
+
+    with transaction.atomic(savepoint=False):
+        new_pairs = [pair for pair, counts in sorted(pairs.items())
+                     if not increment_relationship(*pair, *counts)]
+        if new_pairs:
+            # First orders of these pairs, seed empty rows (a concurrent first order may seed the same
+            # pair, its row is kept) and count the orders into them
+            VendorPurchaserRelationship.objects.bulk_create([
+                VendorPurchaserRelationship(
+                    vendor_id=vendor_id, purchaser_id=purchaser_id,
+                    first_ordered_date=pairs[vendor_id, purchaser_id][1],
+                    last_ordered_date=pairs[vendor_id, purchaser_id][2])
+                for vendor_id, purchaser_id in new_pairs], ignore_conflicts=True)
+            for pair in new_pairs:
+                increment_relationship(*pair, *pairs[pair])
+
+
+def increment_relationship(vendor_id: int, purchaser_id: int, order_count: int, first_ordered_date, last_ordered_date) -> int:
+    return VendorPurchaserRelationship.objects \
+        .filter(vendor_id=vendor_id, purchaser_id=purchaser_id) \
+        .update(order_count=F("order_count") + order_count,
+                first_ordered_date=Least(F("first_ordered_date"), Value(first_ordered_date)),
+                last_ordered_date=Greatest(F("last_ordered_date"), Value(last_ordered_date)))
+
+
+def record_vendor_purchaser_reassignment(purchase_order: PurchaseOrder, previous_vendor_id: int) -> None:
+    """ Moves a purchase order reassigned from `previous_vendor_id`, both pairs are recomputed from their orders """
+    rebuild_vendor_purchaser_relationships(
+        [previous_vendor_id, purchase_order.vendor_id], [purchase_order.purchaser_id])
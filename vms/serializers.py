@@ -1,8 +1,14 @@
-import jsonschema
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import ExpressionWrapper, F, Q, Value
 from django.utils import timezone
-from rest_framework import serializers
+from rest_framework import serializers, ISO_8601
+from rest_framework.settings import api_settings
 from vms.models import PurchaseOrder, Purchaser, Vendor
-from .validators import purchase_order_items_schema
+from .validators import purchase_order_items_errors
+from .items import save_line_items
+from .metrics import purchase_order_counters
 from vms.signals import *
 
 
@@ -19,13 +25,117 @@ class VendorPermormanceSerializer(serializers.ModelSerializer):
                   "average_response_time", "fulfillment_rate"]
 
 
+class PerformanceHistoryQuerySerializer(serializers.Serializer):
+    from_ = serializers.DateTimeField(required=False)
+    to = serializers.DateTimeField(required=False)
+    points = serializers.IntegerField(
+        min_value=1, max_value=settings.PERFORMANCE_HISTORY_MAX_POINTS, default=100)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = fields.pop("from_")
+        return fields
+
+    def validate(self, attrs):
+        attrs.setdefault("to", timezone.now())
+        attrs.setdefault("from", attrs["to"] - timedelta(days=30))
+        if attrs["from"] >= attrs["to"]:
+            raise serializers.ValidationError(
+                "'from' should be earlier than 'to'")
+        return attrs
+
+
 class PurchaserSerializer(serializers.ModelSerializer):
     class Meta:
         model = Purchaser
         fields = ["id", "name", "contact_details", "address"]
 
 
-class AdminPurchaseOrderSerializer(serializers.ModelSerializer):
+class VendorPurchaserSerializer(PurchaserSerializer):
+    """ A purchaser as seen by a vendor, with the history of their relationship """
+    first_ordered_date = serializers.DateTimeField(read_only=True)
+    last_ordered_date = serializers.DateTimeField(read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+
+    class Meta(PurchaserSerializer.Meta):
+        fields = PurchaserSerializer.Meta.fields + \
+            ["first_ordered_date", "last_ordered_date", "order_count"]
+
+
+class SparseFieldsMixin:
+    """ Serializes only the field names given in `fields`, all of them when it is None """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ValuesListSerializer:
+    """ Renders `.values_list()` rows exactly like `serializer_class(many=True)` would render the model instances.
+
+    The field projection (column, converter) is computed once, each row then costs a single dict build
+    instead of a model instance plus DRF's per-field `get_attribute` / `to_representation` calls.
+    Only concrete model fields and primary key relations are supported.
+    """
+    # Fields whose `to_representation` returns database values unchanged
+    PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.FloatField, serializers.CharField,
+                          serializers.ChoiceField, serializers.BooleanField, serializers.JSONField)
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class(fields=fields) \
+            if issubclass(serializer_class, SparseFieldsMixin) else serializer_class()
+        model = serializer_class.Meta.model
+        self.names, self.columns, self.converters = [], [], []
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                converter = None
+            elif isinstance(field, serializers.RelatedField):
+                raise TypeError(f"{name}: only primary key relations can be rendered from rows")
+            elif isinstance(field, serializers.JSONField) and field.binary:
+                converter = field.to_representation
+            elif isinstance(field, self.PASSTHROUGH_FIELDS):
+                converter = None
+            elif isinstance(field, serializers.DateTimeField):
+                converter = self.datetime_converter(field)
+            else:
+                converter = field.to_representation
+            self.names.append(name)
+            self.columns.append(model._meta.get_field(field.source).attname)
+            self.converters.append(converter)
+
+    @staticmethod
+    def datetime_converter(field: serializers.DateTimeField):
+        field_timezone = field.timezone if hasattr(
+            field, "timezone") else field.default_timezone()
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601 or str(field_timezone) != "UTC":
+            return field.to_representation
+
+        # Aware UTC values from the database, same output as `DateTimeField.to_representation`
+        def to_representation(value):
+            value = value.isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return to_representation
+
+    def to_representation(self, rows) -> list[dict]:
+        names = self.names
+        converted = [(name, index, converter) for index, (name, converter) in enumerate(zip(names, self.converters))
+                     if converter is not None]
+        data = []
+        for row in rows:
+            # Extra trailing columns (e.g. the cursor ordering) are dropped by `zip`
+            item = dict(zip(names, row))
+            for name, index, converter in converted:
+                value = row[index]
+                if value is not None:
+                    item[name] = converter(value)
+            data.append(item)
+        return data
+
+
+class AdminPurchaseOrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = PurchaseOrder
@@ -33,7 +143,7 @@ class AdminPurchaseOrderSerializer(serializers.ModelSerializer):
                   "ordered_date", "issued_date", "acknowledged_date", "expected_delivery_date", "actual_delivered_date"]
 
 
-class PurchaserPurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaserPurchaseOrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = PurchaseOrder
@@ -41,7 +151,7 @@ class PurchaserPurchaseOrderSerializer(serializers.ModelSerializer):
                   "ordered_date", "issued_date", "acknowledged_date", "expected_delivery_date", "actual_delivered_date"]
 
 
-class VendorPurchaseOrderSerializer(serializers.ModelSerializer):
+class VendorPurchaseOrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = PurchaseOrder
@@ -62,7 +172,10 @@ class CreatePurchaseOrderSerializer(serializers.ModelSerializer):
         validated_data["purchaser"] = self.context["purchaser"]
         validated_data["quantity"] = self.get_total_quantity(
             validated_data["items"])
-        return super().create(validated_data)
+        with transaction.atomic():
+            purchase_order = super().create(validated_data)
+            save_line_items([purchase_order])
+        return purchase_order
 
     def update(self, instance, validated_data):
         if instance.acknowledged_date:
@@ -70,20 +183,127 @@ class CreatePurchaseOrderSerializer(serializers.ModelSerializer):
                 "You cannot update this purchase order. This Purchase Order is in transist")
         validated_data["quantity"] = self.get_total_quantity(
             validated_data["items"])
-        return super().update(instance, validated_data)
+        previous_counters = purchase_order_counters(instance)
+        previous_vendor_id = instance.vendor_id
+        with transaction.atomic():
+            purchase_order = super().update(instance, validated_data)
+            save_line_items([purchase_order], replace=True)
+            purchase_order_updated.send(
+                self.__class__, purchase_order=purchase_order, previous_counters=previous_counters, previous_vendor_id=previous_vendor_id)
+        return purchase_order
 
     def validate_items(self, value):
-        try:
-            jsonschema.validate(
-                instance=value, schema=purchase_order_items_schema)
-        except jsonschema.exceptions.ValidationError as e:
-            raise serializers.ValidationError(
-                ["The 'items' field should be a JSON array must contain at least one object",
-                 "Each object should contains 'item' and 'quantity' keys, like [{'item': 'x', 'quantity': 'y'}, ...]",
-                 "'quantity' should greater than 1"])
+        errors = purchase_order_items_errors(value)
+        if errors:
+            raise serializers.ValidationError(errors)
         return value
 
 
+class BulkCreatePurchaseOrderSerializer(serializers.BaseSerializer):
+    """ Validates a batch of `CreatePurchaseOrderSerializer` entries on their own, with the vendors loaded in one query.
+
+    `save()` inserts the valid entries with a single `bulk_create`, `data` reports the invalid ones next to them.
+    """
+    entry_serializer = CreatePurchaseOrderSerializer()
+    vendor_error_messages = serializers.PrimaryKeyRelatedField.default_error_messages
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [f"Expected a list of purchase orders, but got {type(data).__name__}."]})
+        elif not data:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Provide at least one purchase order."]})
+        elif len(data) > settings.MAX_BULK_PURCHASE_ORDERS:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [f"Provide at most {settings.MAX_BULK_PURCHASE_ORDERS} purchase orders."]})
+
+        vendor_ids = {self.to_vendor_id(entry.get("vendor")) for entry in data if isinstance(entry, dict)}
+        vendors = Vendor.objects.only("id").in_bulk(
+            [vendor_id for vendor_id in vendor_ids if vendor_id is not None])
+        return [self.validate_entry(entry, vendors) for entry in data]
+
+    @staticmethod
+    def to_vendor_id(value) -> int | None:
+        """ The vendor id `value` stands for, coerced like `PrimaryKeyRelatedField` does ("3" is 3), None when it is none """
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def validate_entry(self, entry, vendors: dict[int, Vendor]) -> tuple[dict | None, dict | None]:
+        """ `(validated_data, None)` for a valid entry, `(None, errors)` otherwise """
+        if not isinstance(entry, dict):
+            return None, {api_settings.NON_FIELD_ERRORS_KEY: [
+                f"Invalid data. Expected a dictionary, but got {type(entry).__name__}."]}
+        errors = {}
+        vendor, vendor_id = entry.get("vendor"), self.to_vendor_id(entry.get("vendor"))
+        if vendor is None:
+            errors["vendor"] = [str(serializers.Field.default_error_messages["required"])]
+        elif vendor_id is None:
+            errors["vendor"] = [self.vendor_error_messages["incorrect_type"].format(
+                data_type=type(vendor).__name__)]
+        elif vendor_id not in vendors:
+            errors["vendor"] = [self.vendor_error_messages["does_not_exist"].format(
+                pk_value=vendor)]
+        if entry.get("items") is None:
+            errors["items"] = [str(serializers.Field.default_error_messages["required"])]
+        else:
+            try:
+                self.entry_serializer.validate_items(entry["items"])
+            except serializers.ValidationError as e:
+                errors["items"] = e.detail
+        if errors:
+            return None, errors
+        return {"vendor_id": vendor_id, "items": entry["items"]}, None
+
+    def save(self, **kwargs):
+        issued_date = timezone.now()
+        purchase_orders = [PurchaseOrder(
+            purchaser=self.context["purchaser"],
+            issued_date=issued_date,
+            quantity=self.entry_serializer.get_total_quantity(entry["items"]),
+            **entry)
+            for entry, errors in self.validated_data if errors is None]
+        if purchase_orders:
+            with transaction.atomic():
+                self.insert(purchase_orders)
+                save_line_items(purchase_orders)
+                purchase_orders_created.send(
+                    self.__class__, purchase_orders=purchase_orders)
+        self.instance = purchase_orders
+        return self.instance
+
+    def insert(self, purchase_orders: list[PurchaseOrder]) -> None:
+        """ `bulk_create` setting the primary keys, also on backends which don't return them (MySQL).
+
+        There the ids are read back by the batch marker (purchaser and the shared `issued_date`), the
+        purchaser row lock keeps concurrent batches of the purchaser out of it.
+        """
+        if connection.features.can_return_rows_from_bulk_insert:
+            PurchaseOrder.objects.bulk_create(purchase_orders)
+            return
+        purchaser, issued_date = purchase_orders[0].purchaser, purchase_orders[0].issued_date
+        Purchaser.objects.select_for_update().filter(pk=purchaser.pk).exists()
+        PurchaseOrder.objects.bulk_create(purchase_orders)
+        ids = PurchaseOrder.objects \
+            .filter(purchaser=purchaser, issued_date=issued_date) \
+            .order_by("id") \
+            .values_list("id", flat=True)
+        # A single INSERT numbers its rows in order
+        for purchase_order, pk in zip(purchase_orders, ids, strict=True):
+            purchase_order.pk = pk
+            purchase_order._state.adding = False
+
+    def to_representation(self, instance):
+        """ One `{"id": ...}` or `{"errors": ...}` per entry of the batch, in the request order """
+        created = iter(instance)
+        return {"results": [{"errors": errors} if errors else {"id": next(created).pk}
+                            for _, errors in self.validated_data]}
+
+
 class VendorAcknowledgePurchaseOrderSerializer(serializers.ModelSerializer):
     expected_delivery_date = serializers.DateTimeField()
 
@@ -93,9 +313,11 @@ class VendorAcknowledgePurchaseOrderSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data["acknowledged_date"] = timezone.now()
-        purchase_order = super().update(instance, validated_data)
-        purchase_order_acknowledged.send_robust(
-            self.__class__, purchase_order=purchase_order)
+        previous_counters = purchase_order_counters(instance)
+        with transaction.atomic():
+            purchase_order = super().update(instance, validated_data)
+            purchase_order_acknowledged.send(
+                self.__class__, purchase_order=purchase_order, previous_counters=previous_counters)
         return purchase_order
 
 
@@ -107,21 +329,130 @@ class VendorDeliveryPurchaseOrderSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         validated_data["actual_delivered_date"] = timezone.now()
         validated_data["status"] = "D"
-        purchase_order = super().update(instance, validated_data)
-        purchase_order_delivered.send_robust(
-            self.__class__, purchase_order=purchase_order)
-        purchase_order_status_changed.send_robust(
-            self.__class__, purchase_order=purchase_order)
+        previous_counters = purchase_order_counters(instance)
+        with transaction.atomic():
+            purchase_order = super().update(instance, validated_data)
+            purchase_order_delivered.send(
+                self.__class__, purchase_order=purchase_order, previous_counters=previous_counters)
         return purchase_order
 
 
+class BulkTransitionPurchaseOrderSerializer(serializers.Serializer):
+    """ Moves a batch of purchase orders to the next state with a single conditional `UPDATE`.
+
+    Orders are taken from the `purchase_orders` queryset of the context (the permission scope), the ones
+    which cannot make the transition are left untouched and reported by `data` with the single action message.
+    """
+    purchase_orders = serializers.ListField(child=serializers.IntegerField())
+    # Orders in a state allowing the transition, see `get_error`
+    transition_filter = Q()
+    transition_signal = None
+
+    def validate_purchase_orders(self, value):
+        if not value:
+            raise serializers.ValidationError("Provide at least one purchase order.")
+        elif len(value) > settings.MAX_BULK_PURCHASE_ORDERS:
+            raise serializers.ValidationError(
+                f"Provide at most {settings.MAX_BULK_PURCHASE_ORDERS} purchase orders.")
+        return list(dict.fromkeys(value))
+
+    def get_error(self, purchase_order: PurchaseOrder) -> str | None:
+        raise NotImplementedError
+
+    def get_changes(self, now) -> dict:
+        """ Field values of the transition, set on the instances and applied by the `UPDATE` """
+        raise NotImplementedError
+
+    def save(self, **kwargs):
+        changes = self.get_changes(timezone.now())
+        self.errors_by_id, transitioned, previous_counters = {}, [], []
+        with transaction.atomic():
+            purchase_orders = self.context["purchase_orders"] \
+                .select_for_update() \
+                .in_bulk(self.validated_data["purchase_orders"])
+            for pk in self.validated_data["purchase_orders"]:
+                purchase_order = purchase_orders.get(pk)
+                error = "Not found." if purchase_order is None else self.get_error(
+                    purchase_order)
+                if error:
+                    self.errors_by_id[pk] = error
+                    continue
+                previous_counters.append(purchase_order_counters(purchase_order))
+                for field, value in changes.items():
+                    setattr(purchase_order, field, value)
+                self.update_instance(purchase_order)
+                transitioned.append(purchase_order)
+            if transitioned:
+                PurchaseOrder.objects \
+                    .filter(self.transition_filter, pk__in=[purchase_order.pk for purchase_order in transitioned]) \
+                    .update(**self.get_update_values(changes))
+                self.transition_signal.send(
+                    self.__class__, purchase_orders=transitioned, previous_counters=previous_counters)
+        self.instance = transitioned
+        return self.instance
+
+    def update_instance(self, purchase_order: PurchaseOrder) -> None:
+        pass
+
+    def get_update_values(self, changes: dict) -> dict:
+        return changes
+
+    def to_representation(self, instance):
+        """ One `{"id": ...}` per transitioned order and `{"id": ..., "errors": [...]}` per other one, in the request order """
+        return {"results": [{"id": pk, "errors": [self.errors_by_id[pk]]} if pk in self.errors_by_id else {"id": pk}
+                            for pk in self.validated_data["purchase_orders"]]}
+
+
+class BulkAcknowledgePurchaseOrderSerializer(BulkTransitionPurchaseOrderSerializer):
+    expected_delivery_date = serializers.DateTimeField()
+    transition_filter = Q(acknowledged_date__isnull=True,
+                          status=PurchaseOrder.PO_PENDING)
+    transition_signal = purchase_orders_acknowledged
+
+    def get_error(self, purchase_order):
+        if purchase_order.acknowledged_date:
+            return "This Purchase Order seems acknowledged already."
+        elif purchase_order.status != PurchaseOrder.PO_PENDING:
+            return "This Purchase Order either cancelled or Delivered already."
+
+    def get_changes(self, now):
+        return {"acknowledged_date": now, "expected_delivery_date": self.validated_data["expected_delivery_date"]}
+
+    def update_instance(self, purchase_order):
+        # As `PurchaseOrder.save` does
+        if purchase_order.issued_date:
+            purchase_order.response_time = purchase_order.acknowledged_date - \
+                purchase_order.issued_date
+
+    def get_update_values(self, changes):
+        return {**changes, "response_time": ExpressionWrapper(
+            Value(changes["acknowledged_date"], output_field=models.DateTimeField()) - F("issued_date"), output_field=models.DurationField())}
+
+
+class BulkDeliveryPurchaseOrderSerializer(BulkTransitionPurchaseOrderSerializer):
+    transition_filter = Q(acknowledged_date__isnull=False,
+                          status=PurchaseOrder.PO_PENDING)
+    transition_signal = purchase_orders_delivered
+
+    def get_error(self, purchase_order):
+        if not purchase_order.acknowledged_date:
+            return "Please acknowledge the Purchase Order before delivering"
+        elif purchase_order.status in [PurchaseOrder.PO_CANCELED, PurchaseOrder.PO_DELIVERED]:
+            return "This Purchase Order either cancelled or Delivered already."
+
+    def get_changes(self, now):
+        return {"actual_delivered_date": now, "status": PurchaseOrder.PO_DELIVERED}
+
+
 class QualityRatingPurchaseOrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = PurchaseOrder
         fields = ["quality_rating"]
 
     def update(self, instance, validated_data):
-        purchase_order = super().update(instance, validated_data)
-        quality_rating_provided.send_robust(
-            self.__class__, purchase_order=purchase_order)
+        previous_counters = purchase_order_counters(instance)
+        with transaction.atomic():
+            purchase_order = super().update(instance, validated_data)
+            quality_rating_provided.send(
+                self.__class__, purchase_order=purchase_order, previous_counters=previous_counters)
         return purchase_order
@@ -4,4 +4,9 @@ from django.dispatch import Signal
 purchase_order_delivered = Signal()
 quality_rating_provided = Signal()
 purchase_order_acknowledged = Signal()
-purchase_order_status_changed = Signal()
+purchase_order_updated = Signal()
+# Sent once for a batch of purchase orders inserted together (`bulk_create` sends no `post_save`)
+purchase_orders_created = Signal()
+# Batched transitions of the bulk vendor actions, with the `previous_counters` of every order
+purchase_orders_acknowledged = Signal()
+purchase_orders_delivered = Signal()
@@ -1,81 +1,56 @@
 from django.dispatch import receiver
-from django.db.models import Count, Sum, Case, When, ExpressionWrapper, F, Avg
-from django.db.models import fields
-from django.utils import timezone
-from vms.models import PurchaseOrder
-from vms.utils import *
+from django.db.models.signals import post_save, post_delete
+from core.authentication import hydrated_users
+from vms.cache import invalidate_vendors
+from vms.models import PurchaseOrder, Purchaser, Vendor
+from vms.metrics import record_purchase_order_change, record_purchase_order_changes, seed_vendor_metric_counters
+from vms.relationships import record_vendor_purchaser_orders, record_vendor_purchaser_reassignment
 from vms.signals import *
 
 
-@receiver(purchase_order_delivered)
-def on_time_delivery_rate(sender, **kwargs):
-    purchase_order = kwargs["purchase_order"]
-    vendor = purchase_order.vendor
-    aggregated_result = PurchaseOrder.objects \
-        .filter(vendor=vendor, status="D") \
-        .aggregate(
-            total_completed_orders=Count('id'),
-            total_completed_orders_ontime=Sum(Case(When(
-                expected_delivery_date__date__gte=timezone.now().date(), then=1), default=0))
-        )
-
-    if aggregated_result["total_completed_orders"]:
-        delivery_rate = calculate_on_time_delivery_rate(
-            aggregated_result["total_completed_orders"], aggregated_result["total_completed_orders_ontime"])
-        vendor.on_time_delivery_rate = delivery_rate
-        vendor.save()
-
-
-@receiver(quality_rating_provided)
-def purhase_order_quality_rating(sender, **kwargs):
-    purchase_order = kwargs["purchase_order"]
-    vendor = purchase_order.vendor
-    aggregated_result = PurchaseOrder.objects \
-        .filter(vendor=vendor, status="D", quality_rating__isnull=False) \
-        .aggregate(
-            total_completed_orders=Count('id'),
-            total_completed_orders_ratings=Sum("quality_rating")
-        )
-
-    if aggregated_result["total_completed_orders"]:
-        quality_rate = calculate_quality_ratings_average(
-            aggregated_result["total_completed_orders"], aggregated_result["total_completed_orders_ratings"])
-        vendor.quality_rating_avg = quality_rate
-        vendor.save()
-
-
-@receiver(purchase_order_acknowledged)
-def average_response_time(sender, **kwargs):
-    purchase_order = kwargs["purchase_order"]
-    vendor = purchase_order.vendor
-    average_response_time = PurchaseOrder.objects \
-        .annotate(
-            response_time=ExpressionWrapper(F('acknowledged_date') - F('issued_date'), output_field=fields.IntegerField())) \
-        .aggregate(average_response_time=Avg('response_time')
-                   )
-
-    average_response_time_in_days = calculate_average_response_time_in_days(
-        average_response_time["average_response_time"])
-
-    vendor.average_response_time = average_response_time_in_days
-    vendor.save()
-
-
-@receiver(purchase_order_status_changed)
-def fulfillment_rate(sender, **kwargs):
-    purchase_order = kwargs["purchase_order"]
-    vendor = purchase_order.vendor
-    aggregated_result = PurchaseOrder.objects \
-        .filter(vendor=vendor) \
-        .aggregate(
-            total_issued_orders=Count('id'),
-            total_completed_orders=Sum(Case(When(
-                status="D", then=1), default=0))
-        )
-
-    if aggregated_result["total_issued_orders"]:
-        fulfillment_rate = calculate_fulfillment_rate(
-            aggregated_result["total_issued_orders"],
-            aggregated_result["total_completed_orders"])
-        vendor.fulfillment_rate = fulfillment_rate
-        vendor.save()
+@receiver(post_save, sender=PurchaseOrder)
+def purchase_order_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_purchase_order_change(instance)
+        record_vendor_purchaser_orders([instance])
+
+
+@receiver(purchase_orders_created)
+def purchase_orders_bulk_created(sender, purchase_orders, **kwargs):
+    record_purchase_order_changes(purchase_orders)
+    record_vendor_purchaser_orders(purchase_orders)
+
+
+@receiver([purchase_orders_acknowledged, purchase_orders_delivered])
+def purchase_orders_transitioned(sender, purchase_orders, previous_counters, **kwargs):
+    record_purchase_order_changes(purchase_orders, previous_counters)
+
+
+@receiver([purchase_order_updated, purchase_order_acknowledged, purchase_order_delivered, quality_rating_provided])
+def vendor_performance_metrics(sender, **kwargs):
+    record_purchase_order_change(
+        kwargs["purchase_order"], kwargs["previous_counters"], kwargs.get("previous_vendor_id"))
+
+
+@receiver(purchase_order_updated)
+def purchase_order_reassigned(sender, purchase_order, previous_vendor_id=None, **kwargs):
+    if previous_vendor_id and previous_vendor_id != purchase_order.vendor_id:
+        record_vendor_purchaser_reassignment(purchase_order, previous_vendor_id)
+
+
+@receiver(post_save, sender=Vendor)
+def vendor_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        seed_vendor_metric_counters([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Vendor)
+def vendor_changed(sender, instance, raw=False, **kwargs):
+    hydrated_users.evict(instance.user_id)
+    if not raw:
+        invalidate_vendors([instance.pk], directory=True)
+
+
+@receiver([post_save, post_delete], sender=Purchaser)
+def purchaser_changed(sender, instance, raw=False, **kwargs):
+    hydrated_users.evict(instance.user_id)
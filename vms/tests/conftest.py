@@ -1,6 +1,12 @@
 import pytest
+from datetime import timedelta
 from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.authentication import hydrated_users
+from core.serializers import ClaimsTokenObtainPairSerializer
 from vms.models import PurchaseOrder, Vendor, Purchaser
 from vms.utils import AUTH_USER_MODEL_CLASS as User
 
@@ -99,8 +105,8 @@ def authendicate_purchaser(api_client):
 @pytest.fixture
 def custom_authendicate_vendor(api_client):
     def do_authendicate_vendor(vendor):
+        # The profile rides on the user, as `ProfileJWTAuthentication` loads it
         user = User(account_type="V", pk=vendor.user_id)
-        vendor = Vendor(pk=vendor.pk)
         user.vendor = vendor
         api_client.force_authenticate(user=user)
     return do_authendicate_vendor
@@ -110,12 +116,22 @@ def custom_authendicate_vendor(api_client):
 def custom_authendicate_purchaser(api_client):
     def do_authendicate_purchaser(purchaser):
         user = User(account_type="P", pk=purchaser.user_id)
-        purchaser = Purchaser(pk=purchaser.pk)
         user.purchaser = purchaser
         api_client.force_authenticate(user=user)
     return do_authendicate_purchaser
 
 
+@pytest.fixture
+def token_authendicate(api_client):
+    def do_token_authendicate(user_id, claims=True):
+        user = User.objects.get(pk=user_id)
+        # As issued by the login API, or a bare token from before the claims were added
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token \
+            if claims else AccessToken.for_user(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f"VMS {token}")
+    return do_token_authendicate
+
+
 @pytest.fixture
 def create_purchaser_from_model():
     def do_create_purchaser_from_model(user_details):
@@ -140,3 +156,30 @@ def create_purchase_order_from_model():
         purchase_order = PurchaseOrder.objects.create(**order_details)
         return purchase_order
     return do_create_purchase_order_from_model
+
+
+@pytest.fixture(autouse=True)
+def clear_vendor_cache(settings):
+    caches[settings.VENDOR_CACHE_ALIAS].clear()
+    # Ids are reused once a test rolls back
+    hydrated_users.clear()
+
+
+@pytest.fixture
+def seed_purchase_orders():
+    def do_seed_purchase_orders(vendors=10, purchasers=10, orders=500):
+        users = User.objects.bulk_create(
+            [User(username=f"user-{index}", account_type=User.VENDOR if index < vendors else User.PURCHASER)
+             for index in range(vendors + purchasers)])
+        vendor_objs = Vendor.objects.bulk_create(
+            [Vendor(user=user, name=user.username) for user in users[:vendors]])
+        purchaser_objs = Purchaser.objects.bulk_create(
+            [Purchaser(user=user, name=user.username) for user in users[vendors:]])
+        now = timezone.now()
+        PurchaseOrder.objects.bulk_create(
+            [PurchaseOrder(vendor=vendor_objs[index % vendors], purchaser=purchaser_objs[index % purchasers],
+                           items=[{"item": f"Smart Watch {index % 50}", "quantity": 1}], quantity=1, status=PurchaseOrder.PO_STATUS[index % 3][0],
+                           expected_delivery_date=now + timedelta(days=index % 30 - 15))
+             for index in range(orders)])
+        return vendor_objs[0], purchaser_objs[0]
+    return do_seed_purchase_orders
@@ -0,0 +1,111 @@
+import pytest
+from django.db.models import F
+from rest_framework import status
+
+from vms import cache
+from vms.models import Vendor
+
+
+@pytest.fixture
+def retrieve_vendor_endpoint(api_client):
+    def do_retrieve_vendor_endpoint(url):
+        return api_client.get(url)
+    return do_retrieve_vendor_endpoint
+
+
+@pytest.fixture
+def cache_stats(monkeypatch):
+    stats = cache.Counter()
+    monkeypatch.setattr(cache, "stats", stats)
+    return stats
+
+
+@pytest.mark.django_db
+class TestVendorCache:
+
+    def test_if_vendor_read_twice_then_served_from_cache(self, retrieve_vendor_endpoint, authendicate_purchaser, create_vendor_from_model, bake_vendor, cache_stats, django_assert_num_queries):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+
+        # The ETag version only
+        with django_assert_num_queries(1):
+            response = retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == vendor.pk
+        assert cache_stats == {"vendor_misses": 1, "vendor_hits": 1}
+
+    def test_if_vendor_changed_by_another_process_then_no_stale_read(self, retrieve_vendor_endpoint, authendicate_purchaser, create_vendor_from_model, bake_vendor, cache_stats):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        before = retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+        # Saved elsewhere, the invalidation never reaches this process
+        Vendor.objects.filter(pk=vendor.pk).update(
+            name="Electronify", version=F("version") + 1)
+
+        response = retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+
+        assert response.json()["name"] == "Electronify"
+        assert response["ETag"] != before["ETag"]
+        assert cache_stats["vendor_hits"] == 0
+
+    def test_if_metrics_updated_then_no_stale_performance_read(self, retrieve_vendor_endpoint, authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, cache_stats):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        authendicate_purchaser()
+        url = f"/api/vendors/{vendor.pk}/performance/"
+        before = retrieve_vendor_endpoint(url).json()
+        cached = retrieve_vendor_endpoint(url).json()
+
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser, status="D"))
+        after = retrieve_vendor_endpoint(url).json()
+
+        assert before == cached
+        assert before["fulfillment_rate"] == 0
+        assert after["fulfillment_rate"] == 2.5
+        assert cache_stats["vendor_hits"] == 1
+
+    def test_if_vendor_profile_saved_then_list_and_detail_refreshed(self, retrieve_vendor_endpoint, authendicate_purchaser, create_vendor_from_model, bake_vendor, cache_stats):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        retrieve_vendor_endpoint("/api/vendors/")
+        retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+        vendor.name = "Electronify"
+        vendor.save()
+
+        listed = retrieve_vendor_endpoint("/api/vendors/").json()
+        retrieved = retrieve_vendor_endpoint(
+            f"/api/vendors/{vendor.pk}/").json()
+
+        assert listed["results"][0]["name"] == "Electronify"
+        assert retrieved["name"] == "Electronify"
+        assert cache_stats["vendors_hits"] == 0
+
+    def test_if_version_evicted_then_earlier_keys_not_reused(self):
+        version = cache.namespace_version("vendor:1")
+        cache.get_cache().delete("vendor:1:version")
+
+        assert cache.namespace_version("vendor:1") > version
+
+    def test_if_admin_reads_cache_stats_then_hits_and_misses_returned(self, retrieve_vendor_endpoint, authendicate_admin, create_vendor_from_model, bake_vendor, cache_stats):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_admin()
+        for _ in range(2):
+            retrieve_vendor_endpoint(f"/api/vendors/{vendor.pk}/")
+
+        response = retrieve_vendor_endpoint("/api/vendors/cache/stats/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["namespaces"] == {
+            "vendor": {"hits": 1, "misses": 1, "hit_ratio": 0.5}}
+
+    def test_if_purchaser_reads_cache_stats_then_return_403(self, retrieve_vendor_endpoint, authendicate_purchaser):
+        authendicate_purchaser()
+
+        response = retrieve_vendor_endpoint("/api/vendors/cache/stats/")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,31 @@
+import json
+import pytest
+from django.db import connection
+from django.db.models.query import QuerySet
+
+from vms.counts import estimated_purchase_orders
+from vms.models import PurchaseOrder
+
+
+@pytest.mark.django_db
+class TestEstimatedPurchaseOrders:
+
+    @pytest.mark.parametrize("plan, estimate", [
+        ({"query_block": {"select_id": 1, "table": {
+            "table_name": "vms_purchaseorder", "access_type": "ref", "rows_examined_per_scan": 1200,
+            "rows_produced_per_join": 400, "filtered": "33.33"}}}, 400),
+        ({"query_block": {"select_id": 1, "nested_loop": [
+            {"table": {"table_name": "U0", "rows_produced_per_join": 30}},
+            {"table": {"table_name": "vms_purchaseorder", "rows_produced_per_join": 25}}]}}, 25),
+        ({"query_block": {"select_id": 1, "message": "Impossible WHERE"}}, None),
+    ])
+    def test_if_mysql_plan_then_rows_estimate_read(self, monkeypatch, plan, estimate):
+        monkeypatch.setattr(connection, "vendor", "mysql")
+        monkeypatch.setattr(QuerySet, "explain", lambda self, **options: json.dumps(plan))
+
+        assert estimated_purchase_orders(PurchaseOrder.objects.filter(status="P")) == estimate
+
+    def test_if_backend_without_estimate_then_none(self, monkeypatch):
+        monkeypatch.setattr(connection, "vendor", "sqlite")
+
+        assert estimated_purchase_orders(PurchaseOrder.objects.filter(status="P")) is None
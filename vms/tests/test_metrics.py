@@ -0,0 +1,282 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from vms import metrics
+from vms.metrics import COUNTER_FIELDS, enqueue_vendor_metrics, process_vendor_metrics_jobs, purchase_order_counters
+from vms.models import PurchaseOrder, Vendor, VendorMetricCounters, VendorMetricsJob
+from vms.signals import purchase_order_delivered
+
+
+@pytest.fixture
+def deliver_purchase_order(api_client):
+    def do_deliver_purchase_order(po_id):
+        return api_client.put(f"/api/purchase_orders/{po_id}/delivery/")
+    return do_deliver_purchase_order
+
+
+@pytest.fixture
+def acknowledge_purchase_order(api_client):
+    def do_acknowledge_purchase_order(po_id):
+        return api_client.put(f"/api/purchase_orders/{po_id}/acknowledge/", data={"expected_delivery_date": timezone.now()})
+    return do_acknowledge_purchase_order
+
+
+@pytest.fixture
+def update_purchase_order(api_client):
+    def do_update_purchase_order(po_id, data):
+        return api_client.put(f"/api/purchase_orders/{po_id}/", data=data, format="json")
+    return do_update_purchase_order
+
+
+@pytest.fixture
+def rate_purchase_order(api_client):
+    def do_rate_purchase_order(po_id, quality_rating):
+        return api_client.put(f"/api/purchase_orders/{po_id}/rating/", data={"quality_rating": quality_rating})
+    return do_rate_purchase_order
+
+
+@pytest.mark.django_db
+class TestVendorMetricCounters:
+
+    def test_if_purchase_orders_created_then_issued_orders_counted(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+
+        counters = VendorMetricCounters.objects.get(vendor=vendor)
+
+        assert counters.issued_orders == 2
+        assert counters.completed_orders == 0
+
+    def test_if_backend_upserts_without_conflict_target_then_first_order_counted(self, monkeypatch, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        # MySQL, `ON DUPLICATE KEY UPDATE` takes no conflict target
+        monkeypatch.setattr(connection.features, "supports_update_conflicts_with_target", False)
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+
+        assert VendorMetricCounters.objects.get(vendor=vendor).issued_orders == 1
+
+    def test_if_vendor_created_then_counters_seeded(self, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+
+        counters = VendorMetricCounters.objects.get(vendor=vendor)
+
+        assert [getattr(counters, field) for field in COUNTER_FIELDS] == [0] * len(COUNTER_FIELDS)
+
+    def test_if_counters_missing_then_seeded_and_incremented_without_rebuild(self, monkeypatch, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        VendorMetricCounters.objects.all().delete()
+        monkeypatch.setattr(metrics, "aggregate_vendor_metric_counters", None)
+
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+
+        assert VendorMetricCounters.objects.get(vendor=vendor).issued_orders == 2
+
+    def test_if_purchase_order_delivered_then_vendor_metrics_updated(self, deliver_purchase_order, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, acknowledged_date=timezone.now(), expected_delivery_date=timezone.now() + timedelta(days=1)))
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+        custom_authendicate_vendor(vendor)
+
+        deliver_purchase_order(purchase_order.pk)
+        counters = VendorMetricCounters.objects.get(vendor=vendor)
+        vendor.refresh_from_db()
+
+        assert (counters.issued_orders, counters.completed_orders,
+                counters.on_time_orders) == (2, 1, 1)
+        assert vendor.on_time_delivery_rate == 5
+        assert vendor.fulfillment_rate == 2.5
+
+    def test_if_purchase_order_delivered_then_metrics_refreshed_in_two_statements(self, django_assert_max_num_queries, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, acknowledged_date=timezone.now(), expected_delivery_date=timezone.now()))
+        previous_counters = purchase_order_counters(purchase_order)
+        purchase_order.status = "D"
+        purchase_order.actual_delivered_date = timezone.now()
+        purchase_order.save()
+
+        with django_assert_max_num_queries(2):
+            purchase_order_delivered.send(
+                None, purchase_order=purchase_order, previous_counters=previous_counters)
+        vendor.refresh_from_db()
+
+        assert vendor.on_time_delivery_rate == 5
+        assert vendor.fulfillment_rate == 5
+        assert vendor.quality_rating_avg is None
+
+    def test_if_purchase_order_moved_to_other_vendor_then_counters_moved(self, update_purchase_order, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser))
+        create_purchase_order_from_model(bake_purchase_order(vendor2, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        update_purchase_order(purchase_order.pk, {"vendor": vendor2.pk, "items": [
+                              {"item": "Smart Watch", "quantity": 1}]})
+
+        assert VendorMetricCounters.objects.get(vendor=vendor1).issued_orders == 0
+        assert VendorMetricCounters.objects.get(vendor=vendor2).issued_orders == 2
+
+    def test_if_purchase_order_acknowledged_then_response_time_averaged_per_vendor(self, acknowledge_purchase_order, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        purchase_order = create_purchase_order_from_model(bake_purchase_order(
+            vendor1, purchaser, issued_date=timezone.now() - timedelta(days=2)))
+        create_purchase_order_from_model(bake_purchase_order(
+            vendor2, purchaser, issued_date=timezone.now() - timedelta(days=30), acknowledged_date=timezone.now()))
+        custom_authendicate_vendor(vendor1)
+
+        acknowledge_purchase_order(purchase_order.pk)
+        purchase_order.refresh_from_db()
+        vendor1.refresh_from_db()
+
+        assert purchase_order.response_time == purchase_order.acknowledged_date - \
+            purchase_order.issued_date
+        assert vendor1.average_response_time == 2
+
+    def test_if_quality_rating_changed_then_rating_replaced(self, rate_purchase_order, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser, status="D"))
+        custom_authendicate_purchaser(purchaser)
+
+        rate_purchase_order(purchase_order.pk, 4)
+        rate_purchase_order(purchase_order.pk, 2)
+        counters = VendorMetricCounters.objects.get(vendor=vendor)
+        vendor.refresh_from_db()
+
+        assert (counters.quality_rating_sum, counters.quality_rating_count) == (2, 1)
+        assert vendor.quality_rating_avg == 2
+
+    def test_if_counters_rebuilt_then_match_purchase_order_history(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        now = timezone.now()
+        create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, status="D", quality_rating=3, issued_date=now - timedelta(days=2), acknowledged_date=now,
+            expected_delivery_date=now, actual_delivered_date=now))
+        create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, status="D", issued_date=now - timedelta(days=1), acknowledged_date=now,
+            expected_delivery_date=now - timedelta(days=1), actual_delivered_date=now))
+        create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+        VendorMetricCounters.objects.all().delete()
+
+        call_command("recompute_vendor_metrics", vendor.pk, stdout=StringIO())
+        counters = VendorMetricCounters.objects.get(vendor=vendor)
+        vendor = Vendor.objects.get(pk=vendor.pk)
+
+        assert (counters.issued_orders, counters.completed_orders, counters.on_time_orders) == (3, 2, 1)
+        assert (counters.quality_rating_sum, counters.quality_rating_count) == (3, 1)
+        assert counters.response_time_count == 2
+        assert counters.response_time_sum == timedelta(days=3).total_seconds()
+        assert vendor.on_time_delivery_rate == 2.5
+        assert vendor.average_response_time == 1.5
+
+
+@pytest.mark.django_db
+class TestVendorMetricsWorker:
+
+    def test_if_burst_of_deliveries_then_coalesced_into_single_recompute(self, settings, django_capture_on_commit_callbacks, deliver_purchase_order, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        settings.VENDOR_METRICS_ASYNC = True
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_orders = [create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, acknowledged_date=timezone.now(), expected_delivery_date=timezone.now())) for _ in range(5)]
+        custom_authendicate_vendor(vendor)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for purchase_order in purchase_orders:
+                deliver_purchase_order(purchase_order.pk)
+        vendor.refresh_from_db()
+
+        assert VendorMetricsJob.objects.filter(vendor=vendor).count() == 1
+        assert vendor.fulfillment_rate is None
+
+        assert process_vendor_metrics_jobs() == 1
+        assert process_vendor_metrics_jobs() == 0
+        vendor.refresh_from_db()
+
+        assert not VendorMetricsJob.objects.exists()
+        assert vendor.fulfillment_rate == 5
+        assert vendor.on_time_delivery_rate == 5
+
+    def test_if_backend_upserts_without_conflict_target_then_job_enqueued(self, monkeypatch, create_vendor_from_model, bake_vendor):
+        monkeypatch.setattr(connection.features, "supports_update_conflicts_with_target", False)
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+
+        enqueue_vendor_metrics([vendor.pk, vendor.pk])
+
+        assert VendorMetricsJob.objects.filter(vendor=vendor).count() == 1
+
+    def test_if_worker_run_once_then_queue_drained(self, create_vendor_from_model, bake_vendor):
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        enqueue_vendor_metrics([vendor1.pk, vendor2.pk, vendor1.pk])
+
+        call_command("run_metrics_worker", "--once", stdout=StringIO())
+
+        assert not VendorMetricsJob.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRecomputeVendorMetrics:
+
+    def test_if_vendor_range_given_then_only_those_vendors_recomputed(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendors = [create_vendor_from_model(
+            bake_vendor(f"vendor-{index}")) for index in range(3)]
+        for vendor in vendors:
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser, status="D"))
+        Vendor.objects.update(fulfillment_rate=None)
+
+        call_command("recompute_vendor_metrics", "--from-vendor", vendors[1].pk,
+                     "--to-vendor", vendors[2].pk, "--batch-size", 1, stdout=StringIO())
+
+        assert list(Vendor.objects.order_by("pk").values_list(
+            "fulfillment_rate", flat=True)) == [None, 5, 5]
+
+    def test_if_vendor_left_without_orders_then_reset(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser, status="D"))
+        PurchaseOrder.objects.update(vendor=vendor2)
+
+        call_command("recompute_vendor_metrics", stdout=StringIO())
+        vendor1.refresh_from_db()
+
+        assert VendorMetricCounters.objects.get(vendor=vendor1).issued_orders == 0
+        assert VendorMetricCounters.objects.get(vendor=vendor2).issued_orders == 1
+        assert vendor1.fulfillment_rate is None
+
+    def test_if_dry_run_then_nothing_written(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser, status="D"))
+        VendorMetricCounters.objects.all().delete()
+        output = StringIO()
+
+        call_command("recompute_vendor_metrics", "--dry-run", stdout=output)
+
+        assert not VendorMetricCounters.objects.exists()
+        assert "Computed metrics for 1 vendors" in output.getvalue()
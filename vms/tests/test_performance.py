@@ -0,0 +1,109 @@
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+
+from vms.models import HistoricalPerformance, PerformanceRollup
+from vms.performance import bucket_start, get_performance_history, prune_vendor_performance, rollup_vendor_performance
+
+
+@pytest.fixture
+def create_snapshot():
+    def do_create_snapshot(vendor, recorded_data, **metrics):
+        snapshot = HistoricalPerformance.objects.create(vendor=vendor, **metrics)
+        HistoricalPerformance.objects.filter(
+            pk=snapshot.pk).update(recorded_data=recorded_data)
+        return snapshot
+    return do_create_snapshot
+
+
+@pytest.mark.django_db
+class TestSnapshotVendorPerformance:
+
+    def test_if_snapshot_taken_then_one_row_per_active_vendor(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        create_vendor_from_model(bake_vendor("vendor-2"))
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser, status="D"))
+
+        call_command("snapshot_vendor_performance", stdout=StringIO())
+        snapshot = HistoricalPerformance.objects.get()
+
+        assert snapshot.vendor_id == vendor1.pk
+        assert snapshot.fulfillment_rate == 5
+        assert snapshot.rolled_up
+
+    def test_if_snapshots_rolled_up_incrementally_then_buckets_accumulate(self, create_snapshot, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        recorded_data = datetime(2024, 1, 17, 10, tzinfo=dt_timezone.utc)
+        create_snapshot(vendor, recorded_data, fulfillment_rate=4)
+        create_snapshot(vendor, recorded_data + timedelta(hours=1))
+
+        rollup_vendor_performance()
+        create_snapshot(vendor, recorded_data + timedelta(days=1),
+                        fulfillment_rate=2)
+        rollup_vendor_performance()
+        daily = PerformanceRollup.objects.get(
+            vendor=vendor, period="D", bucket_start=bucket_start(recorded_data, "D"))
+        weekly = PerformanceRollup.objects.get(vendor=vendor, period="W")
+
+        assert (daily.samples, daily.fulfillment_rate_sum,
+                daily.fulfillment_rate_count) == (2, 4, 1)
+        assert (weekly.fulfillment_rate_min, weekly.fulfillment_rate_max) == (2, 4)
+        assert weekly.bucket_start == datetime(
+            2024, 1, 15, tzinfo=dt_timezone.utc)
+        assert (weekly.samples, weekly.fulfillment_rate_sum,
+                weekly.fulfillment_rate_count) == (3, 6, 2)
+
+    def test_if_pruned_then_only_old_rolled_up_snapshots_deleted(self, create_snapshot, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        create_snapshot(vendor, timezone.now() - timedelta(days=100))
+        rollup_vendor_performance()
+        create_snapshot(vendor, timezone.now() - timedelta(days=100))
+        create_snapshot(vendor, timezone.now())
+        rollup_vendor_performance()
+        HistoricalPerformance.objects.filter(
+            pk=HistoricalPerformance.objects.order_by("pk")[1].pk).update(rolled_up=False)
+
+        assert prune_vendor_performance(retention_days=90) == 1
+        assert HistoricalPerformance.objects.count() == 2
+
+    def test_if_history_range_wide_then_read_from_daily_rollups(self, create_snapshot, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        for day in range(10):
+            create_snapshot(vendor, start + timedelta(days=day, hours=1),
+                            fulfillment_rate=day)
+            create_snapshot(vendor, start + timedelta(days=day, hours=2),
+                            fulfillment_rate=day + 1)
+        rollup_vendor_performance()
+        HistoricalPerformance.objects.all().delete()
+
+        history = get_performance_history(
+            vendor.pk, start, start + timedelta(days=10), points=5)
+
+        assert len(history) == 5
+        assert history[0]["samples"] == 4
+        assert history[0]["fulfillment_rate"] == 1
+        assert (history[0]["fulfillment_rate_min"],
+                history[0]["fulfillment_rate_max"]) == (0, 2)
+
+    def test_if_narrow_buckets_older_than_retention_then_read_from_daily_rollups(self, create_snapshot, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        start = bucket_start(timezone.now() - timedelta(days=120), "D")
+        for day in range(10):
+            create_snapshot(vendor, start + timedelta(days=day, hours=1),
+                            fulfillment_rate=day)
+        create_snapshot(vendor, timezone.now() - timedelta(hours=1), fulfillment_rate=3)
+        rollup_vendor_performance()
+        prune_vendor_performance(retention_days=90)
+
+        old_history = get_performance_history(
+            vendor.pk, start, start + timedelta(days=30), points=100)
+        spanning_history = get_performance_history(
+            vendor.pk, start, timezone.now(), points=1000)
+
+        assert [point["fulfillment_rate"] for point in old_history] == list(range(10))
+        assert [point["fulfillment_rate"] for point in spanning_history] == [*range(10), 3]
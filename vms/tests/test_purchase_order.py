@@ -1,9 +1,19 @@
+import csv
+import io
 import json
 import pytest
+import time
+from datetime import timedelta
+from decimal import Decimal
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from vms.models import PurchaseOrder
+from vms.metrics import rebuild_vendor_metric_counters
+from vms.models import PurchaseOrder, PurchaseOrderItem, VendorMetricCounters, VendorPurchaserRelationship
+from vms.pagination import PurchaseOrderPagination
+from vms.relationships import rebuild_vendor_purchaser_relationships
 
 
 @pytest.fixture
@@ -13,6 +23,20 @@ def list_purchase_orders(api_client):
     return do_list_purchase_orders
 
 
+@pytest.fixture
+def list_purchase_orders_page(api_client):
+    def do_list_purchase_orders_page(url="/api/purchase_orders/", **query_params):
+        return api_client.get(url, query_params)
+    return do_list_purchase_orders_page
+
+
+@pytest.fixture
+def export_purchase_orders(api_client):
+    def do_export_purchase_orders(**query_params):
+        return api_client.get("/api/purchase_orders/export/", query_params)
+    return do_export_purchase_orders
+
+
 @pytest.fixture
 def retrieve_purchase_order(api_client):
     def do_retrieve_purchase_order(po_id):
@@ -41,6 +65,13 @@ def create_purchase_order(api_client):
     return do_create_purchase_order
 
 
+@pytest.fixture
+def bulk_create_purchase_orders(api_client):
+    def do_bulk_create_purchase_orders(data):
+        return api_client.post("/api/purchase_orders/bulk/", data=json.dumps(data), content_type='application/json')
+    return do_bulk_create_purchase_orders
+
+
 @pytest.fixture
 def acknowledge_purchase_order(api_client):
     def do_acknowledge_purchase_order(po_id, data):
@@ -55,6 +86,13 @@ def delivery_purchase_order(api_client):
     return do_delivery_purchase_order
 
 
+@pytest.fixture
+def bulk_transition_purchase_orders(api_client):
+    def do_bulk_transition_purchase_orders(transition, data):
+        return api_client.put(f"/api/purchase_orders/bulk/{transition}/", data=json.dumps(data, default=str), content_type="application/json")
+    return do_bulk_transition_purchase_orders
+
+
 @pytest.fixture
 def rating_purchase_order(api_client):
     def do_rating_purchase_order(po_id, data):
@@ -91,7 +129,7 @@ class TestListPurchaseOrder:
         response_data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response_data) == 2
+        assert len(response_data["results"]) == 2
 
     def test_if_vendor_return_their_issued_purchase_orders_and_200(self, list_purchase_orders, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
         purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
@@ -110,7 +148,7 @@ class TestListPurchaseOrder:
         response_data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response_data) == 2
+        assert len(response_data["results"]) == 2
 
     def test_if_admin_return_all_purchase_order_and_200(self, list_purchase_orders, authendicate_admin, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
         purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
@@ -129,7 +167,289 @@ class TestListPurchaseOrder:
         response_data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response_data) == 3
+        assert len(response_data["results"]) == 3
+
+    def test_if_paginated_then_pages_follow_cursor_newest_first(self, list_purchase_orders_page, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_orders = [create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser)) for _ in range(3)]
+        custom_authendicate_purchaser(purchaser)
+
+        first_page = list_purchase_orders_page(page_size=2).json()
+        second_page = list_purchase_orders_page(first_page["next"]).json()
+
+        assert "count" not in first_page
+        assert [purchase_order["id"] for purchase_order in first_page["results"]] == [
+            purchase_orders[2].pk, purchase_orders[1].pk]
+        assert [purchase_order["id"] for purchase_order in second_page["results"]] == [
+            purchase_orders[0].pk]
+        assert second_page["next"] is None
+
+    def test_if_count_requested_below_threshold_then_exact_count_returned(self, list_purchase_orders_page, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        for _ in range(3):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        response = list_purchase_orders_page(count="true", page_size=2)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["count"] == 3
+        assert response.json()["count_approximate"] is False
+
+    def test_if_count_requested_above_threshold_then_counters_used(self, list_purchase_orders_page, custom_authendicate_vendor, seed_purchase_orders, settings):
+        vendor, _ = seed_purchase_orders(vendors=2, purchasers=2, orders=40)
+        rebuild_vendor_metric_counters()
+        VendorMetricCounters.objects.filter(vendor=vendor).update(issued_orders=5000, completed_orders=1500)
+        settings.EXACT_COUNT_THRESHOLD = 5
+        custom_authendicate_vendor(vendor)
+
+        counted = list_purchase_orders_page(count="true").json()
+        delivered = list_purchase_orders_page(count="true", status=PurchaseOrder.PO_DELIVERED).json()
+
+        assert (counted["count"], counted["count_approximate"]) == (5000, True)
+        assert (delivered["count"], delivered["count_approximate"]) == (1500, True)
+
+    def test_if_purchaser_count_requested_above_threshold_then_relationships_used(self, list_purchase_orders_page, custom_authendicate_purchaser, seed_purchase_orders, settings):
+        vendor, purchaser = seed_purchase_orders(vendors=2, purchasers=3, orders=40)
+        rebuild_vendor_purchaser_relationships()
+        VendorPurchaserRelationship.objects.filter(purchaser=purchaser).update(order_count=700)
+        settings.EXACT_COUNT_THRESHOLD = 5
+        custom_authendicate_purchaser(purchaser)
+
+        counted = list_purchase_orders_page(count="true").json()
+        from_vendor = list_purchase_orders_page(count="true", vendor=vendor.pk).json()
+
+        assert (counted["count"], counted["count_approximate"]) == (1400, True)
+        assert (from_vendor["count"], from_vendor["count_approximate"]) == (700, True)
+
+    def test_if_count_requested_above_threshold_without_counter_then_estimated(self, list_purchase_orders_page, custom_authendicate_vendor, seed_purchase_orders, settings):
+        vendor, _ = seed_purchase_orders(vendors=2, purchasers=2, orders=40)
+        settings.EXACT_COUNT_THRESHOLD = 5
+        custom_authendicate_vendor(vendor)
+
+        response_data = list_purchase_orders_page(count="true", status=PurchaseOrder.PO_PENDING).json()
+
+        assert response_data["count_approximate"] is True
+        if connection.vendor in ["postgresql", "mysql"]:
+            assert response_data["count"] > 5
+        else:
+            # No planner estimate
+            assert response_data["count"] is None
+
+    def test_if_page_size_above_limit_then_limited(self, list_purchase_orders_page, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, monkeypatch):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        for _ in range(3):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        monkeypatch.setattr(PurchaseOrderPagination, "max_page_size", 2)
+        custom_authendicate_purchaser(purchaser)
+
+        response = list_purchase_orders_page(page_size=100)
+
+        assert len(response.json()["results"]) == 2
+
+    def test_if_fields_requested_then_only_those_fields_selected_and_returned(self, list_purchase_orders_page, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        for _ in range(2):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = list_purchase_orders_page(
+                fields="id,status,expected_delivery_date")
+        next_page = list_purchase_orders_page(
+            fields="status", page_size=1).json()["next"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [set(purchase_order) for purchase_order in response.json()["results"]] == [
+            {"id", "status", "expected_delivery_date"}] * 2
+        assert not any('"items"' in query["sql"]
+                       for query in queries.captured_queries)
+        assert list_purchase_orders_page(next_page).json()["results"] == [
+            {"status": "P"}]
+
+    def test_if_msgpack_accepted_then_return_msgpack(self, api_client, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        msgpack = pytest.importorskip("msgpack")
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        response = api_client.get(
+            "/api/purchase_orders/", HTTP_ACCEPT="application/msgpack")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content)["results"][0]["id"] == purchase_order.pk
+
+    def test_if_purchaser_search_item_then_their_matching_orders_returned(self, list_purchase_orders_page, create_purchase_order, bulk_create_purchase_orders, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, bake_purchaser, bake_vendor):
+        purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        purchaser2 = create_purchaser_from_model(bake_purchaser("purchaser-2"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser2)
+        create_purchase_order({"vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 1}]})
+        custom_authendicate_purchaser(purchaser1)
+        ids = [result["id"] for result in bulk_create_purchase_orders([
+            {"vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 1}]},
+            {"vendor": vendor.pk, "items": [{"item": "Smart Phone", "quantity": 1}, {"item": "Watch Strap", "quantity": 1}]},
+            {"vendor": vendor.pk, "items": [{"item": "Laptop-Stand", "quantity": 1}]},
+        ]).json()["results"]]
+
+        def search(item):
+            response = list_purchase_orders_page(item=item)
+            assert response.status_code == status.HTTP_200_OK
+            return sorted(result["id"] for result in response.json()["results"])
+
+        assert search("watch") == [ids[0], ids[1]]
+        assert search("SMART wat") == [ids[0], ids[1]]
+        assert search("smart strap") == [ids[1]]
+        assert search("stand") == [ids[2]]
+        assert search("tablet") == []
+        assert search("--") == []
+
+    def test_if_vendor_search_item_then_their_matching_orders_returned(self, list_purchase_orders_page, bulk_create_purchase_orders, custom_authendicate_purchaser, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        custom_authendicate_purchaser(purchaser)
+        ids = [result["id"] for result in bulk_create_purchase_orders([
+            {"vendor": vendor1.pk, "items": [{"item": "Smart Watch", "quantity": 1}]},
+            {"vendor": vendor2.pk, "items": [{"item": "Smart Watch", "quantity": 1}]},
+        ]).json()["results"]]
+        custom_authendicate_vendor(vendor1)
+
+        response = list_purchase_orders_page(item="smart")
+
+        assert [result["id"] for result in response.json()["results"]] == [ids[0]]
+
+    def test_if_vendor_filter_status_dates_and_overdue_then_matching_orders_returned(self, list_purchase_orders_page, custom_authendicate_vendor, create_purchase_order_from_model, bake_purchase_order, create_purchaser_from_model, create_vendor_from_model, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        now = timezone.now()
+        overdue = create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, expected_delivery_date=now - timedelta(days=1)))
+        pending = create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, expected_delivery_date=now + timedelta(days=5)))
+        delivered = create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, status=PurchaseOrder.PO_DELIVERED, expected_delivery_date=now - timedelta(days=3)))
+        custom_authendicate_vendor(vendor)
+
+        def filtered(**query_params):
+            response = list_purchase_orders_page(**query_params)
+            assert response.status_code == status.HTTP_200_OK
+            return sorted(result["id"] for result in response.json()["results"])
+
+        assert filtered(status=PurchaseOrder.PO_PENDING) == [overdue.pk, pending.pk]
+        assert filtered(overdue="true") == [overdue.pk]
+        assert filtered(overdue="false") == [pending.pk, delivered.pk]
+        assert filtered(expected_delivery_date_before=now.isoformat()) == [overdue.pk, delivered.pk]
+        assert filtered(status=PurchaseOrder.PO_DELIVERED,
+                        expected_delivery_date_after=(now - timedelta(days=2)).isoformat()) == []
+        assert filtered(ordered_date_after=(now - timedelta(hours=1)).isoformat()) == \
+            [overdue.pk, pending.pk, delivered.pk]
+        assert filtered(ordered_date_before=(now - timedelta(hours=1)).isoformat()) == []
+
+    def test_if_filter_value_invalid_then_return_400(self, list_purchase_orders_page, custom_authendicate_vendor, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_vendor(vendor)
+
+        response = list_purchase_orders_page(status="X", ordered_date_after="yesterday")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.json()) == {"status", "ordered_date"}
+
+    def test_if_unknown_field_requested_then_return_400(self, list_purchase_orders_page, custom_authendicate_vendor, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_vendor(vendor)
+
+        response = list_purchase_orders_page(fields="id,vendor")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"fields": ["Unknown fields: vendor"]}
+
+
+@pytest.mark.django_db
+class TestExportPurchaseOrder:
+
+    def test_if_anonymous_return_401(self, export_purchase_orders):
+        response = export_purchase_orders(format="csv")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_vendor_export_csv_then_their_purchase_orders_streamed(self, export_purchase_orders, list_purchase_orders, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        for vendor in (vendor1, vendor2, vendor1):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        custom_authendicate_vendor(vendor1)
+
+        response = export_purchase_orders(format="csv")
+        rows = list(csv.DictReader(io.StringIO(
+            b"".join(response.streaming_content).decode())))
+        results = list_purchase_orders().json()["results"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert response["Content-Disposition"] == 'attachment; filename="purchase_orders.csv"'
+        assert [int(row["id"]) for row in rows] == [
+            result["id"] for result in results]
+        assert json.loads(rows[0]["items"]) == results[0]["items"]
+        assert rows[0]["ordered_date"] == results[0]["ordered_date"]
+        assert rows[0]["acknowledged_date"] == ""
+
+    def test_if_export_ndjson_then_lines_same_as_list(self, settings, export_purchase_orders, list_purchase_orders, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        settings.EXPORT_CHUNK_SIZE = 2
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        for _ in range(5):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        response = export_purchase_orders(format="ndjson")
+        chunks = list(response.streaming_content)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert len(chunks) == 3
+        assert [json.loads(line) for line in b"".join(chunks).splitlines()] == \
+            list_purchase_orders().json()["results"]
+
+    def test_if_orders_share_ordered_date_then_every_chunk_continues_after_the_last(self, settings, export_purchase_orders, authendicate_admin, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        settings.EXPORT_CHUNK_SIZE = 2
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_orders = [create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser)) for _ in range(5)]
+        PurchaseOrder.objects.update(ordered_date=timezone.now())
+        authendicate_admin()
+
+        response = export_purchase_orders(format="csv", fields="id")
+
+        assert b"".join(response.streaming_content).decode().splitlines()[1:] == [
+            str(purchase_order.pk) for purchase_order in reversed(purchase_orders)]
+
+    def test_if_fields_requested_then_only_those_columns_exported(self, export_purchase_orders, authendicate_admin, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        authendicate_admin()
+
+        response = export_purchase_orders(format="csv", fields="id,status")
+
+        assert b"".join(response.streaming_content).decode().splitlines() == [
+            "id,status", f"{purchase_order.pk},P"]
 
 
 @pytest.mark.django_db
@@ -173,6 +493,44 @@ class TestCreatePurchaseOrder:
         assert response.status_code == status.HTTP_201_CREATED
         assert response_data["vendor"] == vendor.pk
 
+    def test_if_purchaser_create_then_line_items_written(self, create_purchase_order, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = create_purchase_order({"vendor": vendor.pk, "items": [
+            {"item": "Smart Watch", "quantity": 10, "unit_price": 99.95}, {"item": "Smart Phone", "quantity": 20}]})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert list(PurchaseOrderItem.objects.order_by("id").values_list("purchase_order_id", "vendor_id", "item", "quantity", "unit_price")) == [
+            (response.json()["id"], vendor.pk, "Smart Watch", 10, Decimal("99.95")),
+            (response.json()["id"], vendor.pk, "Smart Phone", 20, None)]
+
+    def test_if_items_invalid_return_errors_by_index_and_400(self, create_purchase_order, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = create_purchase_order({"vendor": vendor.pk, "items": [
+            {"item": "Smart Watch", "quantity": 10}, {"item": "Smart Phone", "quantity": 0}]})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"items": {
+            "1": {"quantity": ["0 is less than the minimum of 1"]}}}
+
+    def test_if_msgpack_body_return_created_order_and_201(self, api_client, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        msgpack = pytest.importorskip("msgpack")
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = api_client.post("/api/purchase_orders/", data=msgpack.packb({
+            "vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 10}]
+        }), content_type="application/msgpack")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert PurchaseOrder.objects.get().quantity == 10
+
     def test_if_vendor_return_403(self, create_purchase_order, create_vendor_from_model, bake_vendor, custom_authendicate_vendor):
         vendor = create_vendor_from_model(bake_vendor("vendor-1"))
         request_body = {
@@ -210,6 +568,152 @@ class TestCreatePurchaseOrder:
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
+@pytest.mark.django_db
+class TestBulkCreatePurchaseOrder:
+
+    def test_if_anonymous_return_401(self, bulk_create_purchase_orders):
+        response = bulk_create_purchase_orders([])
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_vendor_return_403(self, bulk_create_purchase_orders, create_vendor_from_model, bake_vendor, custom_authendicate_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_vendor(vendor)
+
+        response = bulk_create_purchase_orders(
+            [{"vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 10}]}])
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_every_entry_valid_return_ids_and_201(self, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        custom_authendicate_purchaser(purchaser)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = bulk_create_purchase_orders([
+                {"vendor": vendor1.pk, "items": [
+                    {"item": "Smart Watch", "quantity": 10}, {"item": "Smart Phone", "quantity": 20}]},
+                {"vendor": vendor2.pk, "items": [
+                    {"item": "Smart Watch", "quantity": 5}]},
+                {"vendor": vendor1.pk, "items": [
+                    {"item": "Smart Phone", "quantity": 1}]},
+            ])
+        results = response.json()["results"]
+        purchase_orders = PurchaseOrder.objects.in_bulk(
+            [result["id"] for result in results])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [purchase_orders[result["id"]].quantity for result in results] == [
+            30, 5, 1]
+        assert all(purchase_order.purchaser_id == purchaser.pk and purchase_order.issued_date
+                   for purchase_order in purchase_orders.values())
+        assert len([query for query in queries.captured_queries
+                    if query["sql"].startswith('INSERT INTO "vms_purchaseorder" ')]) == 1
+        assert VendorMetricCounters.objects.get(
+            vendor=vendor1).issued_orders == 2
+        assert VendorPurchaserRelationship.objects.get(
+            vendor=vendor1, purchaser=purchaser).order_count == 2
+        assert list(PurchaseOrderItem.objects.filter(purchase_order_id=results[0]["id"])
+                    .values_list("vendor_id", "item", "quantity")) == [
+            (vendor1.pk, "Smart Watch", 10), (vendor1.pk, "Smart Phone", 20)]
+
+    def test_if_backend_returns_no_ids_then_ids_read_back(self, monkeypatch, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        # MySQL, `bulk_create` leaves the primary keys unset
+        monkeypatch.setattr(type(connection.features), "can_return_rows_from_bulk_insert", False)
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+        earlier_results = bulk_create_purchase_orders([
+            {"vendor": vendor.pk, "items": [{"item": "Laptop", "quantity": 1}]}]).json()["results"]
+
+        response = bulk_create_purchase_orders([
+            {"vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 10}]},
+            {"vendor": vendor.pk, "items": [{"item": "Smart Phone", "quantity": 2}]},
+        ])
+        results = response.json()["results"]
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [PurchaseOrder.objects.get(pk=result["id"]).quantity for result in earlier_results + results] == [
+            1, 10, 2]
+        assert list(PurchaseOrderItem.objects.order_by("purchase_order_id")
+                    .values_list("purchase_order_id", "item")) == [
+            (earlier_results[0]["id"], "Laptop"), (results[0]["id"], "Smart Watch"), (results[1]["id"], "Smart Phone")]
+
+    def test_if_some_entries_invalid_return_errors_and_207(self, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = bulk_create_purchase_orders([
+            {"vendor": vendor.pk + 1,
+                "items": [{"item": "Smart Watch", "quantity": 10}]},
+            {"vendor": vendor.pk, "items": [
+                {"item": "Smart Watch", "quantity": 10}]},
+            {"vendor": "x", "items": []},
+            [],
+        ])
+        results = response.json()["results"]
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert results[0] == {"errors": {
+            "vendor": [f'Invalid pk "{vendor.pk + 1}" - object does not exist.']}}
+        assert results[1] == {"id": PurchaseOrder.objects.get().pk}
+        assert set(results[2]["errors"]) == {"vendor", "items"}
+        assert results[3] == {"errors": {"non_field_errors": [
+            "Invalid data. Expected a dictionary, but got list."]}}
+
+    def test_if_vendor_id_a_string_then_accepted_like_single_create(self, create_purchase_order, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+        entry = {"vendor": str(vendor.pk), "items": [{"item": "Smart Watch", "quantity": 10}]}
+
+        created = create_purchase_order(entry)
+        response = bulk_create_purchase_orders([entry, {**entry, "vendor": "x"}])
+        results = response.json()["results"]
+
+        assert created.status_code == status.HTTP_201_CREATED
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert PurchaseOrder.objects.get(pk=results[0]["id"]).vendor_id == vendor.pk
+        assert results[1] == {"errors": {
+            "vendor": ["Incorrect type. Expected pk value, received str."]}}
+
+    def test_if_no_entry_valid_return_errors_and_400(self, bulk_create_purchase_orders, create_purchaser_from_model, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = bulk_create_purchase_orders([{"items": [{"item": "Smart Watch", "quantity": 10}]}])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"results": [{"errors": {"vendor": ["This field is required."]}}]}
+        assert not PurchaseOrder.objects.exists()
+
+    @pytest.mark.parametrize("data", [{}, [], "purchase orders"])
+    def test_if_not_a_list_of_purchase_orders_return_400(self, data, bulk_create_purchase_orders, create_purchaser_from_model, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = bulk_create_purchase_orders(data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "non_field_errors" in response.json()
+
+    def test_if_too_many_entries_return_400(self, settings, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        settings.MAX_BULK_PURCHASE_ORDERS = 2
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = bulk_create_purchase_orders(
+            [{"vendor": vendor.pk, "items": [{"item": "Smart Watch", "quantity": 10}]}] * 3)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"non_field_errors": [
+            "Provide at most 2 purchase orders."]}
+
+
 @pytest.mark.django_db
 class TestRetrivePurchaseOrder:
     def test_if_anonymous_return_401(self, retrieve_purchase_order, create_purchaser_from_model, bake_purchaser, create_vendor_from_model, bake_vendor, create_purchase_order_from_model, bake_purchase_order):
@@ -235,6 +739,34 @@ class TestRetrivePurchaseOrder:
         assert response.status_code == status.HTTP_200_OK
         assert response_data["id"] == purchase_order.pk
 
+    def test_if_purchaser_token_authenticated_then_only_purchase_order_queried(self, retrieve_purchase_order, token_authendicate, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, django_assert_num_queries):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        token_authendicate(purchaser.user_id)
+        # The first request hydrates the user for the active check, kept for `HYDRATED_USER_CACHE_TTL`
+        with django_assert_num_queries(2):
+            retrieve_purchase_order(purchase_order.pk)
+
+        with django_assert_num_queries(1):
+            response = retrieve_purchase_order(purchase_order.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_purchaser_token_without_claims_then_profile_not_looked_up_again(self, retrieve_purchase_order, token_authendicate, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, django_assert_num_queries):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        token_authendicate(purchaser.user_id, claims=False)
+
+        # User with its profile, then the purchase order
+        with django_assert_num_queries(2):
+            response = retrieve_purchase_order(purchase_order.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+
     def test_if_purchaser_requesting_other_purchaser_PO_return_404(self, retrieve_purchase_order, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
         purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
         purchaser2 = create_purchaser_from_model(bake_purchaser("purchaser-2"))
@@ -332,6 +864,8 @@ class TestUpdatePurchaseOrder:
         assert response.status_code == status.HTTP_200_OK
         assert len(response_data["items"]) == 1
         assert response_data["items"] == request_body["items"]
+        assert list(PurchaseOrderItem.objects.values_list("purchase_order_id", "item", "quantity")) == [
+            (purchase_order.pk, "Smart Watch", 100)]
 
     def test_if_purchaser_update_others_PO_return_404(self, update_purchase_order, custom_authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
         purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
@@ -681,6 +1215,114 @@ class TestDeliveryPurchaseOrder:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestBulkTransitionPurchaseOrder:
+
+    def assert_counters_match_history(self, vendor):
+        counters = VendorMetricCounters.objects.filter(
+            vendor=vendor).values().get()
+        rebuild_vendor_metric_counters([vendor.pk])
+
+        assert counters == pytest.approx(VendorMetricCounters.objects.filter(
+            vendor=vendor).values().get())
+
+    @pytest.mark.parametrize("transition", ["acknowledge", "delivery"])
+    def test_if_purchaser_return_403(self, transition, bulk_transition_purchase_orders, custom_authendicate_purchaser, create_purchaser_from_model, bake_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        custom_authendicate_purchaser(purchaser)
+
+        response = bulk_transition_purchase_orders(
+            transition, {"purchase_orders": [1], "expected_delivery_date": timezone.now()})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_vendor_acknowledges_then_pending_orders_acknowledged_and_others_reported(self, bulk_transition_purchase_orders, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        issued_date = timezone.now() - timedelta(days=1)
+        pending = [create_purchase_order_from_model(bake_purchase_order(
+            vendor1, purchaser, issued_date=issued_date)) for _ in range(2)]
+        acknowledged = create_purchase_order_from_model(bake_purchase_order(
+            vendor1, purchaser, issued_date=issued_date, acknowledged_date=timezone.now()))
+        canceled = create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser, status="C"))
+        other_vendors = create_purchase_order_from_model(
+            bake_purchase_order(vendor2, purchaser))
+        expected_delivery_date = timezone.now() + timedelta(days=3)
+        custom_authendicate_vendor(vendor1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = bulk_transition_purchase_orders("acknowledge", {
+                "purchase_orders": [pending[0].pk, acknowledged.pk, canceled.pk, other_vendors.pk, pending[1].pk],
+                "expected_delivery_date": expected_delivery_date})
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.json()["results"] == [
+            {"id": pending[0].pk},
+            {"id": acknowledged.pk, "errors": [
+                "This Purchase Order seems acknowledged already."]},
+            {"id": canceled.pk, "errors": [
+                "This Purchase Order either cancelled or Delivered already."]},
+            {"id": other_vendors.pk, "errors": ["Not found."]},
+            {"id": pending[1].pk},
+        ]
+        for purchase_order in PurchaseOrder.objects.filter(pk__in=[pending[0].pk, pending[1].pk]):
+            assert purchase_order.expected_delivery_date == expected_delivery_date
+            assert purchase_order.response_time == purchase_order.acknowledged_date - issued_date
+        assert len([query for query in queries.captured_queries
+                    if query["sql"].startswith('UPDATE "vms_purchaseorder" ')]) == 1
+        assert len([query for query in queries.captured_queries
+                    if query["sql"].startswith('UPDATE "vms_vendormetriccounters"')]) == 1
+        assert PurchaseOrder.objects.get(
+            pk=other_vendors.pk).acknowledged_date is None
+        self.assert_counters_match_history(vendor1)
+
+    def test_if_vendor_delivers_then_acknowledged_orders_delivered(self, bulk_transition_purchase_orders, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        now = timezone.now()
+        purchase_orders = [create_purchase_order_from_model(bake_purchase_order(
+            vendor, purchaser, issued_date=now, acknowledged_date=now,
+            expected_delivery_date=now + timedelta(days=index - 1))) for index in range(3)]
+        custom_authendicate_vendor(vendor)
+
+        response = bulk_transition_purchase_orders(
+            "delivery", {"purchase_orders": [purchase_order.pk for purchase_order in purchase_orders]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(PurchaseOrder.objects.values_list("status", flat=True)) == {"D"}
+        assert VendorMetricCounters.objects.get(
+            vendor=vendor).completed_orders == 3
+        self.assert_counters_match_history(vendor)
+
+    def test_if_no_order_can_be_delivered_return_400(self, bulk_transition_purchase_orders, custom_authendicate_vendor, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser))
+        custom_authendicate_vendor(vendor)
+
+        response = bulk_transition_purchase_orders(
+            "delivery", {"purchase_orders": [purchase_order.pk]})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["results"] == [{"id": purchase_order.pk, "errors": [
+            "Please acknowledge the Purchase Order before delivering"]}]
+        assert PurchaseOrder.objects.get().status == "P"
+
+    def test_if_no_orders_given_return_400(self, bulk_transition_purchase_orders, custom_authendicate_vendor, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        custom_authendicate_vendor(vendor)
+
+        response = bulk_transition_purchase_orders(
+            "delivery", {"purchase_orders": []})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"purchase_orders": [
+            "Provide at least one purchase order."]}
+
+
 @pytest.mark.django_db
 class TestRatingPurchaseOrder:
 
@@ -755,3 +1397,30 @@ class TestRatingPurchaseOrder:
         response = rating_purchase_order(purchase_order.pk, request_body)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestBulkCreatePurchaseOrderBenchmark:
+
+    def test_if_two_hundred_orders_created_then_compare_endpoints(self, create_purchase_order, bulk_create_purchase_orders, create_vendor_from_model, create_purchaser_from_model, bake_vendor, bake_purchaser, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendors = [create_vendor_from_model(bake_vendor(f"vendor-{index}")) for index in range(10)]
+        custom_authendicate_purchaser(purchaser)
+        entries = [{"vendor": vendors[index % 10].pk, "items": [
+            {"item": "Smart Watch", "quantity": 10}, {"item": "Smart Phone", "quantity": 20}]}
+            for index in range(200)]
+
+        started_at = time.perf_counter()
+        for entry in entries:
+            assert create_purchase_order(entry).status_code == status.HTTP_201_CREATED
+        single = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        assert bulk_create_purchase_orders(entries).status_code == status.HTTP_201_CREATED
+        bulk = time.perf_counter() - started_at
+
+        print(f"\nsingle {len(entries) / single:8.0f} orders/s  bulk {len(entries) / bulk:8.0f} orders/s  "
+              f"({single / bulk:.1f}x)")
+        assert PurchaseOrder.objects.count() == 400
+        assert single / bulk >= 5
@@ -1,6 +1,13 @@
 import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
+from vms import relationships
+from vms.models import PurchaseOrder, VendorPurchaserRelationship
+
 
 @pytest.fixture
 def list_purchasers(api_client):
@@ -63,7 +70,28 @@ class TestListPurchaser:
         response_data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response_data) == 2
+        assert len(response_data["results"]) == 2
+
+    def test_if_vendor_access_their_puchasers_list_then_relationship_returned_without_distinct(self, list_purchasers, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, custom_authendicate_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        purchase_orders = [create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser)) for _ in range(3)]
+        custom_authendicate_vendor(vendor)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = list_purchasers()
+        result = response.json()["results"][0]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["results"]) == 1
+        assert result["order_count"] == 3
+        assert result["first_ordered_date"] == \
+            purchase_orders[0].ordered_date.isoformat().replace("+00:00", "Z")
+        assert result["last_ordered_date"] == \
+            purchase_orders[-1].ordered_date.isoformat().replace("+00:00", "Z")
+        assert not any("DISTINCT" in query["sql"]
+                       for query in queries.captured_queries)
 
     def test_if_admin_access_all_puchasers_list_return_200(self, list_purchasers, authendicate_admin, create_purchaser_from_model, bake_purchaser):
         purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
@@ -75,7 +103,7 @@ class TestListPurchaser:
         response_data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response_data) == 2
+        assert len(response_data["results"]) == 2
 
 
 @pytest.mark.django_db
@@ -202,3 +230,79 @@ class TestUpdateMePurchaser:
         response = update_me_purchaser(request_body)
 
         assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestVendorPurchaserRelationship:
+
+    def test_if_purchase_orders_created_then_relationship_counted(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        purchase_orders = [create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser)) for _ in range(2)]
+        create_purchase_order_from_model(bake_purchase_order(vendor2, purchaser))
+
+        relationship = VendorPurchaserRelationship.objects.get(
+            vendor=vendor1, purchaser=purchaser)
+
+        assert VendorPurchaserRelationship.objects.count() == 2
+        assert relationship.order_count == 2
+        assert relationship.first_ordered_date == purchase_orders[0].ordered_date
+        assert relationship.last_ordered_date == purchase_orders[1].ordered_date
+
+    def test_if_pair_seeded_concurrently_then_orders_added_to_it(self, monkeypatch, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        concurrent_order = create_purchase_order_from_model(bake_purchase_order(vendor, purchaser))
+        purchase_orders = PurchaseOrder.objects.bulk_create(
+            [PurchaseOrder(**bake_purchase_order(vendor, purchaser)) for _ in range(2)])
+        # The concurrent first order seeds the pair right after the UPDATE found nothing
+        increment_relationship, calls = relationships.increment_relationship, []
+
+        def first_update_misses(*args):
+            calls.append(args)
+            return 0 if len(calls) == 1 else increment_relationship(*args)
+        monkeypatch.setattr(relationships, "increment_relationship", first_update_misses)
+
+        with CaptureQueriesContext(connection) as queries:
+            relationships.record_vendor_purchaser_orders(purchase_orders)
+        relationship = VendorPurchaserRelationship.objects.get()
+
+        # No delete and re-insert, which would collide with the concurrently seeded row
+        assert not any(query["sql"].startswith("DELETE ") for query in queries.captured_queries)
+        assert relationship.order_count == 3
+        assert relationship.first_ordered_date == concurrent_order.ordered_date
+        assert relationship.last_ordered_date == purchase_orders[1].ordered_date
+
+    def test_if_purchase_order_reassigned_then_relationship_moved(self, api_client, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor, custom_authendicate_purchaser):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor1 = create_vendor_from_model(bake_vendor("vendor-1"))
+        vendor2 = create_vendor_from_model(bake_vendor("vendor-2"))
+        purchase_order = create_purchase_order_from_model(
+            bake_purchase_order(vendor1, purchaser))
+        custom_authendicate_purchaser(purchaser)
+
+        response = api_client.put(f"/api/purchase_orders/{purchase_order.pk}/", data={
+            "vendor": vendor2.pk, "items": [{"item": "Smart Watch", "quantity": 10}]}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(VendorPurchaserRelationship.objects.values_list("vendor_id", "order_count")) == [
+            (vendor2.pk, 1)]
+
+    def test_if_rebuilt_then_relationships_match_purchase_orders(self, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser1 = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        purchaser2 = create_purchaser_from_model(bake_purchaser("purchaser-2"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        for purchaser in (purchaser1, purchaser1, purchaser2):
+            create_purchase_order_from_model(
+                bake_purchase_order(vendor, purchaser))
+        PurchaseOrder.objects.filter(purchaser=purchaser2).delete()
+        VendorPurchaserRelationship.objects.filter(
+            purchaser=purchaser1).delete()
+
+        call_command("rebuild_vendor_purchaser_relationships",
+                     vendor.pk, stdout=StringIO())
+
+        assert list(VendorPurchaserRelationship.objects.values_list("purchaser_id", "order_count")) == [
+            (purchaser1.pk, 2)]
@@ -0,0 +1,83 @@
+import pytest
+from itertools import combinations
+from django.db.models import Count, Q
+from django.utils import timezone
+from vms.filters import PurchaseOrderFilter, PurchaserFilter, VendorFilter
+from vms.models import PurchaseOrder, Purchaser
+from vms.pagination import PurchaseOrderPagination
+from vms.relationships import rebuild_vendor_purchaser_relationships
+from vms.tests.utils import assert_uses_index
+
+
+FILTERS = {
+    "status": {"status": PurchaseOrder.PO_DELIVERED},
+    "ordered_date": {"ordered_date_after": "2024-01-01T00:00:00Z", "ordered_date_before": "2030-01-01T00:00:00Z"},
+    "expected_delivery_date": {"expected_delivery_date_after": "2024-01-01T00:00:00Z"},
+    "overdue": {"overdue": "true"},
+}
+
+
+@pytest.mark.django_db
+class TestPurchaseOrderQueryPlans:
+
+    @pytest.mark.parametrize("scope", ["vendor", "purchaser", "admin"])
+    @pytest.mark.parametrize("filters", [names for size in range(1, len(FILTERS) + 1)
+                                         for names in combinations(FILTERS, size)], ids="+".join)
+    def test_if_orders_filtered_then_index_used(self, seed_purchase_orders, scope, filters):
+        vendor, purchaser = seed_purchase_orders()
+        queryset = PurchaseOrder.objects.all()
+        if scope == "vendor":
+            filterset_class, queryset = PurchaserFilter, queryset.filter(vendor_id=vendor.pk)
+        elif scope == "purchaser":
+            filterset_class, queryset = VendorFilter, queryset.filter(purchaser_id=purchaser.pk)
+        else:
+            filterset_class = PurchaseOrderFilter
+        data = {key: value for name in filters for key, value in FILTERS[name].items()}
+
+        filterset = filterset_class(data, queryset)
+
+        assert filterset.is_valid(), filterset.errors
+        assert_uses_index(filterset.qs.order_by(*PurchaseOrderPagination.ordering))
+
+    def test_if_vendor_lists_orders_then_index_used(self, seed_purchase_orders):
+        vendor, _ = seed_purchase_orders()
+
+        assert_uses_index(PurchaseOrder.objects
+                          .filter(vendor_id=vendor.pk)
+                          .order_by("-ordered_date", "-id"))
+
+    def test_if_purchaser_lists_orders_then_index_used(self, seed_purchase_orders):
+        _, purchaser = seed_purchase_orders()
+
+        assert_uses_index(PurchaseOrder.objects
+                          .filter(purchaser_id=purchaser.pk)
+                          .order_by("-ordered_date", "-id"))
+
+    def test_if_orders_filtered_by_vendor_and_status_then_index_used(self, seed_purchase_orders):
+        vendor, _ = seed_purchase_orders()
+
+        assert_uses_index(PurchaseOrder.objects.filter(
+            vendor_id=vendor.pk, status=PurchaseOrder.PO_DELIVERED))
+
+    def test_if_overdue_pending_orders_listed_then_index_used(self, seed_purchase_orders):
+        vendor, _ = seed_purchase_orders()
+
+        assert_uses_index(PurchaseOrder.objects.filter(
+            vendor_id=vendor.pk, status=PurchaseOrder.PO_PENDING, expected_delivery_date__lt=timezone.now()))
+
+    def test_if_vendor_counters_rebuilt_then_index_used(self, seed_purchase_orders):
+        vendor, _ = seed_purchase_orders()
+
+        assert_uses_index(PurchaseOrder.objects
+                          .filter(vendor_id__in=[vendor.pk])
+                          .values("vendor_id")
+                          .annotate(acknowledged=Count("id", filter=Q(acknowledged_date__isnull=False)))
+                          .order_by("vendor_id"))
+
+    def test_if_vendor_lists_purchasers_then_relationship_index_used(self, seed_purchase_orders):
+        vendor, _ = seed_purchase_orders()
+        rebuild_vendor_purchaser_relationships()
+
+        assert_uses_index(Purchaser.objects
+                          .filter(vendor_relationships__vendor_id=vendor.pk)
+                          .order_by("id"), table="vms_vendorpurchaserrelationship")
@@ -0,0 +1,118 @@
+import pytest
+import time
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from vms.models import PurchaseOrder
+from vms.serializers import AdminPurchaseOrderSerializer, PurchaserPurchaseOrderSerializer, VendorPurchaseOrderSerializer, CreatePurchaseOrderSerializer, ValuesListSerializer
+
+PURCHASE_ORDER_SERIALIZERS = [AdminPurchaseOrderSerializer, PurchaserPurchaseOrderSerializer,
+                              VendorPurchaseOrderSerializer, CreatePurchaseOrderSerializer]
+
+
+@pytest.fixture
+def create_purchase_orders(create_purchaser_from_model, create_vendor_from_model, bake_purchase_order, bake_purchaser, bake_vendor):
+    def do_create_purchase_orders(count=None):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        issued_date = timezone.now().replace(microsecond=0)
+        states = [
+            {},
+            {"issued_date": issued_date},
+            {"issued_date": issued_date + timedelta(microseconds=7),
+             "acknowledged_date": issued_date + timedelta(days=1, seconds=5),
+             "expected_delivery_date": issued_date + timedelta(days=4)},
+            {"status": "D", "quality_rating": 4, "items": [{"item": "Ünicode ✓", "quantity": 1}],
+             "issued_date": issued_date, "acknowledged_date": issued_date + timedelta(hours=3),
+             "expected_delivery_date": issued_date + timedelta(days=2),
+             "actual_delivered_date": issued_date + timedelta(days=2, microseconds=120)},
+            {"status": "C", "quality_rating": 2.5, "items": []},
+        ]
+        count = count or len(states)
+        return PurchaseOrder.objects.bulk_create(
+            [PurchaseOrder(**bake_purchase_order(vendor, purchaser, **states[index % len(states)]))
+             for index in range(count)])
+    return do_create_purchase_orders
+
+
+def render_with_model_serializer(serializer_class, fields=None):
+    kwargs = {"fields": fields} if fields else {}
+    return JSONRenderer().render(serializer_class(PurchaseOrder.objects.order_by("id"), many=True, **kwargs).data)
+
+
+def render_with_values_list_serializer(serializer_class, fields=None):
+    serializer = ValuesListSerializer(serializer_class, fields=fields)
+    rows = PurchaseOrder.objects.order_by(
+        "id").values_list(*serializer.columns, named=True)
+    return JSONRenderer().render(serializer.to_representation(rows))
+
+
+@pytest.mark.django_db
+class TestValuesListSerializer:
+
+    @pytest.mark.parametrize("serializer_class", PURCHASE_ORDER_SERIALIZERS)
+    def test_if_rows_rendered_then_bytes_identical_to_model_serializer(self, serializer_class, create_purchase_orders):
+        create_purchase_orders()
+
+        assert render_with_values_list_serializer(serializer_class) == \
+            render_with_model_serializer(serializer_class)
+
+    def test_if_sparse_fields_rendered_then_bytes_identical_to_model_serializer(self, create_purchase_orders):
+        create_purchase_orders()
+        fields = ["status", "id", "actual_delivered_date"]
+
+        assert render_with_values_list_serializer(VendorPurchaseOrderSerializer, fields) == \
+            render_with_model_serializer(VendorPurchaseOrderSerializer, fields)
+
+    def test_if_timezone_not_utc_then_bytes_identical_to_model_serializer(self, create_purchase_orders, settings):
+        create_purchase_orders()
+        settings.TIME_ZONE = "Asia/Kolkata"
+
+        assert render_with_values_list_serializer(AdminPurchaseOrderSerializer) == \
+            render_with_model_serializer(AdminPurchaseOrderSerializer)
+
+
+def best_of(function, rounds=5):
+    timings = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestValuesListSerializerBenchmark:
+
+    def test_if_thousand_rows_serialized_then_five_times_faster(self, create_purchase_orders):
+        create_purchase_orders(count=1000)
+        serializer = ValuesListSerializer(AdminPurchaseOrderSerializer)
+        purchase_orders = list(PurchaseOrder.objects.order_by("id"))
+        rows = list(PurchaseOrder.objects.order_by(
+            "id").values_list(*serializer.columns, named=True))
+
+        model_serializer = best_of(lambda: AdminPurchaseOrderSerializer(
+            purchase_orders, many=True).data)
+        values_list_serializer = best_of(
+            lambda: serializer.to_representation(rows))
+        print(f"\nserialize 1000 rows: ModelSerializer {model_serializer * 1000:.1f}ms, "
+              f"ValuesListSerializer {values_list_serializer * 1000:.1f}ms, "
+              f"{model_serializer / values_list_serializer:.1f}x")
+
+        assert model_serializer / values_list_serializer >= 5
+
+    def test_if_thousand_rows_listed_then_faster_end_to_end(self, create_purchase_orders):
+        create_purchase_orders(count=1000)
+
+        model_serializer = best_of(
+            lambda: render_with_model_serializer(AdminPurchaseOrderSerializer))
+        values_list_serializer = best_of(
+            lambda: render_with_values_list_serializer(AdminPurchaseOrderSerializer))
+        print(f"\nfetch + serialize + render 1000 rows: ModelSerializer {model_serializer * 1000:.1f}ms, "
+              f"ValuesListSerializer {values_list_serializer * 1000:.1f}ms, "
+              f"{model_serializer / values_list_serializer:.1f}x")
+
+        # Fetching dominates the fast path on SQLite, which parses every datetime column from text
+        assert model_serializer / values_list_serializer >= 2
@@ -0,0 +1,83 @@
+import jsonschema
+import pytest
+import time
+
+from vms.validators import (purchase_order_items_conform, purchase_order_items_errors,
+                            purchase_order_items_schema, purchase_order_items_validator)
+
+
+def bake_items(count):
+    return [{"item": f"Smart Watch {index}", "quantity": index + 1} for index in range(count)]
+
+
+class TestPurchaseOrderItemsValidator:
+
+    @pytest.mark.parametrize("value", [
+        bake_items(1), bake_items(10), [{"item": "Smart Watch", "quantity": 1.0}],
+        [{"item": "Smart Watch", "quantity": 1, "unit_price": 99.95}]])
+    def test_if_valid_then_no_errors(self, value):
+        assert purchase_order_items_errors(value) == []
+        assert purchase_order_items_validator.is_valid(value)
+
+    @pytest.mark.parametrize("value", [
+        {"item": "Smart Watch", "quantity": 1}, [], [{"item": "Smart Watch", "quantity": True}],
+        [{"item": "Smart Watch", "quantity": 1.0}], [{"item": "Smart Watch"}], [["Smart Watch", 1]],
+        [{"item": "x" * 256, "quantity": 1}], [{"item": "Smart Watch", "quantity": 1, "unit_price": 1}]])
+    def test_if_fast_path_accepts_then_schema_accepts(self, value):
+        assert not purchase_order_items_conform(value) or \
+            purchase_order_items_validator.is_valid(value)
+
+    def test_if_not_a_list_then_top_level_error(self):
+        assert purchase_order_items_errors({"item": "Smart Watch", "quantity": 1}) == [
+            "{'item': 'Smart Watch', 'quantity': 1} is not of type 'array'"]
+
+    def test_if_items_invalid_then_errors_keyed_by_index_and_field(self):
+        errors = purchase_order_items_errors([
+            {"item": "Smart Watch", "quantity": 0},
+            {"item": "Smart Phone", "quantity": 2},
+            "Smart Phone",
+            {"item": 1},
+            {"item": "Smart Phone", "quantity": 2, "colour": "Red"},
+        ])
+
+        assert errors == {
+            0: {"quantity": ["0 is less than the minimum of 1"]},
+            2: {"non_field_errors": ["'Smart Phone' is not of type 'object'"]},
+            3: {"item": ["1 is not of type 'string'"], "quantity": ["This field is required."]},
+            4: {"colour": ["Unexpected field."]},
+        }
+
+    def test_if_price_negative_or_name_too_long_then_errors(self):
+        errors = purchase_order_items_errors([
+            {"item": "Smart Watch", "quantity": 1, "unit_price": -1},
+            {"item": "x" * 256, "quantity": 1},
+        ])
+
+        assert errors == {
+            0: {"unit_price": ["-1 is less than the minimum of 0"]},
+            1: {"item": [f"'{'x' * 256}' is too long"]},
+        }
+
+
+@pytest.mark.benchmark
+class TestPurchaseOrderItemsValidatorBenchmark:
+
+    def test_if_ten_items_validated_then_compare_per_call_cost(self):
+        items = bake_items(10)
+
+        def per_call(function, calls=2000):
+            started_at = time.perf_counter()
+            for _ in range(calls):
+                function()
+            return (time.perf_counter() - started_at) / calls
+
+        timings = {
+            "jsonschema.validate": per_call(lambda: jsonschema.validate(items, purchase_order_items_schema)),
+            "compiled": per_call(lambda: purchase_order_items_validator.validate(items)),
+            "fast path": per_call(lambda: purchase_order_items_errors(items)),
+        }
+        print()
+        for name, timing in timings.items():
+            print(f"{name:20} {timing * 10**6:8.1f}us per call")
+
+        assert timings["fast path"] < timings["compiled"] < timings["jsonschema.validate"]
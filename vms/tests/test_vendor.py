@@ -1,6 +1,10 @@
 import pytest
+from datetime import timedelta
 from rest_framework import status
 from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from vms.models import HistoricalPerformance, Vendor
 
 
 @pytest.fixture
@@ -12,8 +16,8 @@ def list_vendors(api_client):
 
 @pytest.fixture
 def retrieve_vendor(api_client):
-    def do_retrieve_vendor(vendor_id):
-        return api_client.get(f"/api/vendors/{vendor_id}/")
+    def do_retrieve_vendor(vendor_id, **headers):
+        return api_client.get(f"/api/vendors/{vendor_id}/", **headers)
     return do_retrieve_vendor
 
 
@@ -40,11 +44,18 @@ def update_me_vendor(api_client):
 
 @pytest.fixture
 def retrieve_performance_matrix(api_client):
-    def do_retrieve_performance_matrix(vendor_id):
-        return api_client.get(f"/api/vendors/{vendor_id}/performance/")
+    def do_retrieve_performance_matrix(vendor_id, **headers):
+        return api_client.get(f"/api/vendors/{vendor_id}/performance/", **headers)
     return do_retrieve_performance_matrix
 
 
+@pytest.fixture
+def retrieve_performance_history(api_client):
+    def do_retrieve_performance_history(vendor_id, **query_params):
+        return api_client.get(f"/api/vendors/{vendor_id}/performance/history/", query_params)
+    return do_retrieve_performance_history
+
+
 @pytest.mark.django_db
 class TestListVendor:
     def test_if_anonymous_user_access_vendors_list_return_401(self, list_vendors):
@@ -108,6 +119,31 @@ class TestRetriveVendor:
         assert response.status_code == status.HTTP_200_OK
 
 
+    def test_if_etag_matches_return_304(self, authendicate_purchaser, create_vendor_from_model, retrieve_vendor, bake_vendor, django_assert_num_queries):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        etag = retrieve_vendor(vendor.id)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = retrieve_vendor(vendor.id, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_if_profile_changed_after_etag_return_200(self, authendicate_purchaser, create_vendor_from_model, retrieve_vendor, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        etag = retrieve_vendor(vendor.id)["ETag"]
+        vendor.name = "Electronify"
+        vendor.save(update_fields=["name"])
+
+        response = retrieve_vendor(vendor.id, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Electronify"
+        assert response["ETag"] != etag
+
+
 @pytest.mark.django_db
 class TestRetrieveMeVendor:
 
@@ -140,6 +176,44 @@ class TestRetrieveMeVendor:
         assert response.status_code == status.HTTP_200_OK
 
 
+    def test_if_vendor_token_authenticated_return_profile_loaded_by_claim(self, retrieve_me_vendor, token_authendicate, create_vendor_from_model, bake_vendor, django_assert_num_queries):
+        vendor = create_vendor_from_model(
+            {**bake_vendor("vendor-1"), "account_type": "V"})
+        token_authendicate(vendor.user_id)
+        retrieve_me_vendor()
+
+        # The profile only, the user of the active check is hydrated
+        with django_assert_num_queries(1):
+            response = retrieve_me_vendor()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == vendor.pk
+
+    def test_if_vendor_profile_updated_then_hydrated_profile_refreshed(self, retrieve_me_vendor, token_authendicate, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(
+            {**bake_vendor("vendor-1"), "account_type": "V"})
+        token_authendicate(vendor.user_id)
+        retrieve_me_vendor()
+        vendor.name = "Electronify"
+        vendor.save()
+
+        response = retrieve_me_vendor()
+
+        assert response.json()["name"] == "Electronify"
+
+    def test_if_vendor_profile_changed_elsewhere_then_no_stale_profile(self, retrieve_me_vendor, token_authendicate, create_vendor_from_model, bake_vendor):
+        vendor = create_vendor_from_model(
+            {**bake_vendor("vendor-1"), "account_type": "V"})
+        token_authendicate(vendor.user_id)
+        retrieve_me_vendor()
+        # Saved by another process, the hydrated user of this one is not evicted
+        Vendor.objects.filter(pk=vendor.pk).update(name="Electronify")
+
+        response = retrieve_me_vendor()
+
+        assert response.json()["name"] == "Electronify"
+
+
 @pytest.mark.django_db
 class TestUpdateMeVendor:
 
@@ -208,3 +282,62 @@ class TestRetrievePerformanceMatrixVendor:
         response = retrieve_performance_matrix(vendor.id)
 
         assert response.status_code == status.HTTP_200_OK
+
+
+    def test_if_metrics_changed_after_etag_return_200(self, authendicate_purchaser, create_purchaser_from_model, create_vendor_from_model, create_purchase_order_from_model, retrieve_performance_matrix, bake_purchase_order, bake_purchaser, bake_vendor):
+        purchaser = create_purchaser_from_model(bake_purchaser("purchaser-1"))
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_purchaser()
+        etag = retrieve_performance_matrix(vendor.id)["ETag"]
+        not_modified = retrieve_performance_matrix(
+            vendor.id, HTTP_IF_NONE_MATCH=etag)
+        create_purchase_order_from_model(
+            bake_purchase_order(vendor, purchaser, status="D"))
+
+        response = retrieve_performance_matrix(
+            vendor.id, HTTP_IF_NONE_MATCH=etag)
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["fulfillment_rate"] == 5
+
+
+@pytest.mark.django_db
+class TestRetrievePerformanceHistoryVendor:
+    def test_if_anonymous_user_return_401(self, create_vendor_from_model, retrieve_performance_history, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+
+        response = retrieve_performance_history(vendor.id)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_purchaser_return_downsampled_history_and_200(self, authendicate_purchaser, create_vendor_from_model, retrieve_performance_history, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        # Within the raw snapshot retention
+        start = timezone.now().replace(second=0, microsecond=0) - timedelta(days=1)
+        for minute in range(60):
+            snapshot = HistoricalPerformance.objects.create(
+                vendor=vendor, fulfillment_rate=minute % 5)
+            HistoricalPerformance.objects.filter(pk=snapshot.pk).update(
+                recorded_data=start + timedelta(minutes=minute))
+        authendicate_purchaser()
+
+        response = retrieve_performance_history(
+            vendor.id, **{"from": start.isoformat(), "to": (start + timedelta(hours=1)).isoformat(), "points": 4})
+        points = response.json()["points"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(points) == 4
+        assert points[0]["samples"] == 15
+        assert points[0]["fulfillment_rate"] == 2
+        assert (points[0]["fulfillment_rate_min"],
+                points[0]["fulfillment_rate_max"]) == (0, 4)
+
+    def test_if_points_above_limit_return_400(self, settings, authendicate_vendor, create_vendor_from_model, retrieve_performance_history, bake_vendor):
+        vendor = create_vendor_from_model(bake_vendor("vendor-1"))
+        authendicate_vendor()
+
+        response = retrieve_performance_history(
+            vendor.id, points=settings.PERFORMANCE_HISTORY_MAX_POINTS + 1)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
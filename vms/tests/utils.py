@@ -0,0 +1,36 @@
+import json
+from django.db import connection
+
+
+def full_table_scans(queryset) -> list[str]:
+    """ Tables the query plan of `queryset` reads with a full (sequential) scan """
+    if connection.vendor == "postgresql":
+        # Tiny test tables are cheaper to scan, make the planner pick an index whenever one applies
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        try:
+            plan = queryset.explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+        return [line.split(" on ")[1].split()[0] for line in plan.splitlines() if "Seq Scan on" in line]
+    elif connection.vendor == "mysql":
+        plan = json.loads(queryset.explain(format="json"))
+        scans, nodes = [], [plan]
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, dict):
+                if node.get("access_type") == "ALL":
+                    scans.append(node["table_name"])
+                nodes.extend(node.values())
+            elif isinstance(node, list):
+                nodes.extend(node)
+        return scans
+    # SQLite, `SCAN <table>` without `USING ... INDEX` walks the whole table
+    return [line.split("SCAN ")[1].split()[0] for line in queryset.explain().splitlines()
+            if "SCAN " in line and "USING" not in line]
+
+
+def assert_uses_index(queryset, table: str = "vms_purchaseorder") -> None:
+    scans = full_table_scans(queryset)
+    assert table not in scans, f"full scan of {table}:\n{queryset.explain()}"
@@ -1,21 +1,34 @@
 from django.conf import settings
 from django.apps import apps
+from django.db import connection
+from django.core.exceptions import ObjectDoesNotExist
 
 AUTH_USER_MODEL_CLASS = apps.get_model(
     *settings.AUTH_USER_MODEL.rsplit(".", 1))
 
 
-def calculate_on_time_delivery_rate(total_completed_orders: int, total_completed_orders_ontime: int) -> float:
-    return (total_completed_orders_ontime/total_completed_orders) * settings.RATING_BASE_VALUE
+PROFILE_RELATED_NAMES = {"V": "vendor", "P": "purchaser"}
 
 
-def calculate_fulfillment_rate(total_issued_orders: int, total_completed_orders: int) -> float:
-    return (total_completed_orders/total_issued_orders) * settings.RATING_BASE_VALUE
+def get_profile(user):
+    """ Vendor or Purchaser profile of `user` (None for admins), loaded with the user by the authentication """
+    related_name = PROFILE_RELATED_NAMES.get(getattr(user, "account_type", None))
+    if related_name is None:
+        return None
+    try:
+        return getattr(user, related_name)
+    except ObjectDoesNotExist:
+        return None
 
 
-def calculate_quality_ratings_average(total_completed_orders: int, total_completed_orders_ratings: int) -> float:
-    return (total_completed_orders_ratings/total_completed_orders)
+def get_profile_id(user) -> int | None:
+    if hasattr(user, "profile_id"):
+        # Stateless token principal, the id is a claim
+        return user.profile_id
+    profile = get_profile(user)
+    return profile.pk if profile is not None else None
 
 
-def calculate_average_response_time_in_days(average_repsponse_time_in_microsecond: float) -> float:
-    return format((average_repsponse_time_in_microsecond/((10**6) * 60 * 60 * 24)), ".1f")
+def conflict_target(unique_fields: list[str]) -> list[str] | None:
+    """ `unique_fields` of an upserting `bulk_create`, MySQL upserts on any unique key and takes none """
+    return unique_fields if connection.features.supports_update_conflicts_with_target else None
@@ -1,3 +1,5 @@
+from jsonschema import Draft7Validator
+
 
 purchase_order_items_schema = {
     "$schema": "http://json-schema.org/draft-07/schema#",
@@ -5,11 +7,65 @@ purchase_order_items_schema = {
     "items": {
         "type": "object",
         "properties": {
-            "item": {"type": "string"},
-            "quantity": {"type": "integer", "minimum": 1}
+            "item": {"type": "string", "maxLength": 255},
+            "quantity": {"type": "integer", "minimum": 1},
+            # Stored as a decimal(12, 2)
+            "unit_price": {"type": "number", "minimum": 0, "maximum": 9999999999.99}
         },
         "required": ["item", "quantity"],
         "additionalProperties": False
     },
     "minItems": 1,
 }
+
+# Compiled (and checked against the meta-schema) once, `jsonschema.validate` does both on every call
+Draft7Validator.check_schema(purchase_order_items_schema)
+purchase_order_items_validator = Draft7Validator(purchase_order_items_schema)
+
+PURCHASE_ORDER_ITEM_KEYS = {"item", "quantity", "unit_price"}
+
+
+def purchase_order_items_conform(value) -> bool:
+    """ Hand-written check of the common shape, True only for items the schema accepts.
+
+    Anything else (including valid but less common input, e.g. priced items or `1.0` quantities) goes through the full validator.
+    """
+    if type(value) is not list or not value:
+        return False
+    for item in value:
+        if type(item) is not dict or len(item) != 2 or "item" not in item or "quantity" not in item \
+                or type(item["item"]) is not str or len(item["item"]) > 255 \
+                or type(item["quantity"]) is not int or item["quantity"] < 1:
+            return False
+    return True
+
+
+def purchase_order_items_errors(value) -> list | dict:
+    """ Errors of `value` against `purchase_order_items_schema`, empty when valid.
+
+    Errors of an item are keyed by its index and then by its field (`non_field_errors` for the item
+    itself), like the errors of a DRF `ListField`.
+    """
+    if purchase_order_items_conform(value):
+        return []
+    errors, item_errors = [], {}
+    for error in purchase_order_items_validator.iter_errors(value):
+        if not error.path:
+            errors.append(error.message)
+            continue
+        index, *field = error.path
+        fields = item_errors.setdefault(index, {})
+        if field:
+            fields.setdefault(field[0], []).append(error.message)
+        elif error.validator == "required":
+            for name in error.validator_value:
+                if name not in error.instance:
+                    fields.setdefault(name, []).append("This field is required.")
+        elif error.validator == "additionalProperties":
+            for name in error.instance.keys() - PURCHASE_ORDER_ITEM_KEYS:
+                fields.setdefault(name, []).append("Unexpected field.")
+        else:
+            fields.setdefault("non_field_errors", []).append(error.message)
+    if errors or not item_errors:
+        return errors
+    return dict(sorted(item_errors.items()))
@@ -1,27 +1,54 @@
+import os
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
-from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, SAFE_METHODS
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from core.renderers import CSVRenderer, NDJSONRenderer
+from .cache import cached, stats_summary, vendor_namespace
 from .filters import *
+from .pagination import PurchaseOrderPagination
+from .performance import get_performance_history
 from .models import *
 from .permissions import *
 from .serializers import *
+from .utils import get_profile, get_profile_id
+
+
+def vendor_etag(request, pk, *args, **kwargs) -> str | None:
+    """ Weak ETag of a vendor representation, a single primary key lookup of its `version`
+
+    The version is kept on the request, the cached representations are keyed by it.
+    """
+    version = Vendor.objects.filter(pk=pk).values_list(
+        "version", flat=True).first()
+    request.vendor_version = version
+    return None if version is None else f'W/"vendor-{pk}-{version}"'
 
 
 class VendorViewsSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
 
     queryset = Vendor.objects.all()
     serializer_class = VendorSerializer
+    lookup_value_regex = r"\d+"
 
     def get_permissions(self):
         if self.request.method in SAFE_METHODS:
             if self.action == "me":
                 return [IsVendor()]
+            elif self.action == "cache_stats":
+                return [IsAdminUser()]
             return [IsAuthenticated()]
         elif self.request.method == "PUT":
             if self.action == "me":
@@ -29,18 +56,30 @@ class VendorViewsSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericVi
 
     @extend_schema(description="Returns the list of Vendors. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Get vendors list")
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        # Same for every user, keyed by the full URL (cursor, page size, host of the page links)
+        return self.cached_response("vendors", request.build_absolute_uri(), super().list, request, *args, **kwargs)
 
-    @extend_schema(description="Returns the specific Vendor details. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Retrive vendor details")
+    @extend_schema(description="Returns the specific Vendor details, answers `304` when `If-None-Match` holds the current `ETag`. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Retrive vendor details")
+    @method_decorator(condition(etag_func=vendor_etag))
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(vendor_namespace(kwargs["pk"]), f"detail:{request.vendor_version}", super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, namespace: str, key: str, view, *args, **kwargs) -> Response:
+        """ Reads the response data of `view` through the vendor cache """
+        return Response(cached(namespace, key, lambda: view(*args, **kwargs).data))
+
+    @extend_schema(description="Returns the hits, misses and hit ratio of the vendor cache, counted by the process serving the request since it started. *Allowed Users*: [`Admin`]", summary="Vendor cache statistics", responses=OpenApiTypes.OBJECT)
+    @action(detail=False, methods=["GET"], url_path="cache/stats")
+    def cache_stats(self, request: Request):
+        return Response({"process": os.getpid(), "cache": settings.VENDOR_CACHE_ALIAS,
+                         "namespaces": stats_summary()})
 
     @extend_schema(description="Returns Vendor profile details. *Allowed Users*: [`Vendor`]", summary="Retrive my detials", methods=["GET"])
     @extend_schema(description="Updates Vendor details. *Allowed Users*: [`Vendor`]", summary="Update my detials", methods=["PUT"])
     @action(detail=False, methods=["GET", "PUT", "OPTIONS", "HEAD"])
     def me(self, request: Request):
-        vendor = get_object_or_404(
-            Vendor.objects.all(), user_id=request.user.id)
+        # Loaded fresh, the hydrated profile is shared by the requests of the process (read only)
+        vendor = get_object_or_404(Vendor.objects.all(), pk=get_profile_id(request.user))
         if request.method == "GET":
             serializer = VendorSerializer(vendor)
             return Response(serializer.data)
@@ -50,13 +89,27 @@ class VendorViewsSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericVi
             serializer.save()
             return Response(serializer.data)
 
-    @extend_schema(description="Returns Vendor performance matrix. *Allowed Users*: [`Admin`, `Purchaser`, `Vendor`]", summary="Retrive performance matrix")
+    @extend_schema(description="Returns Vendor performance matrix, answers `304` when `If-None-Match` holds the current `ETag`. *Allowed Users*: [`Admin`, `Purchaser`, `Vendor`]", summary="Retrive performance matrix")
     @action(detail=True, methods=SAFE_METHODS)
+    @method_decorator(condition(etag_func=vendor_etag))
     def performance(self, request: Request, pk: str):
-        vendor = get_object_or_404(
-            Vendor.objects.all(), pk=pk)
-        serializer = VendorPermormanceSerializer(vendor)
-        return Response(serializer.data)
+        def performance_data():
+            vendor = get_object_or_404(
+                Vendor.objects.all(), pk=pk)
+            return VendorPermormanceSerializer(vendor).data
+        return Response(cached(vendor_namespace(pk), f"performance:{request.vendor_version}", performance_data))
+
+    @extend_schema(description="Returns Vendor performance history between `from` and `to` (defaults to last 30 days), downsampled to at most `points` buckets holding the average, minimum and maximum of each metric. *Allowed Users*: [`Admin`, `Purchaser`, `Vendor`]", summary="Retrive performance history", parameters=[PerformanceHistoryQuerySerializer])
+    @action(detail=True, methods=SAFE_METHODS, url_path="performance/history")
+    def performance_history(self, request: Request, pk: str):
+        vendor = get_object_or_404(Vendor.objects.only("pk"), pk=pk)
+        serializer = PerformanceHistoryQuerySerializer(
+            data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        start, end = serializer.validated_data["from"], serializer.validated_data["to"]
+        history = get_performance_history(
+            vendor.pk, start, end, serializer.validated_data["points"])
+        return Response({"from": start, "to": end, "points": history})
 
 
 class PurchaserViewset(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
@@ -71,12 +124,22 @@ class PurchaserViewset(mixins.ListModelMixin, mixins.RetrieveModelMixin, Generic
             if self.action == "me":
                 return [IsPurchaser()]
 
+    def get_serializer_class(self):
+        # Anonymous while the API schema is generated
+        if getattr(self.request.user, "account_type", None) == "V":
+            return VendorPurchaserSerializer
+        return PurchaserSerializer
+
     def get_queryset(self):
         queryset = Purchaser.objects.all()
         user = self.request.user
         if user.account_type == "V":
-            queryset = queryset.filter(
-                orders__vendor__user_id=user.pk).distinct()
+            # One relationship row per purchaser, no DISTINCT over the vendor's orders
+            queryset = queryset \
+                .filter(vendor_relationships__vendor_id=get_profile_id(user)) \
+                .annotate(first_ordered_date=F("vendor_relationships__first_ordered_date"),
+                          last_ordered_date=F("vendor_relationships__last_ordered_date"),
+                          order_count=F("vendor_relationships__order_count"))
         return queryset
 
     @extend_schema(description="Returns the list of Purchasers based on `Permissions`. *Allowed Users*: [`Admin`, `Vendor`]", summary="Get purchasers list")
@@ -91,9 +154,8 @@ class PurchaserViewset(mixins.ListModelMixin, mixins.RetrieveModelMixin, Generic
     @extend_schema(description="Updates Purchaser details. *Allowed Users*: [`Purchaser`]", summary="Update my detials", methods=["PUT"])
     @action(detail=False, methods=["GET", "PUT", "OPTIONS", "HEAD"])
     def me(self, request: Request):
-
-        purchaser = get_object_or_404(
-            Purchaser.objects.all(), user_id=request.user.id)
+        # Loaded fresh, the hydrated profile is shared by the requests of the process (read only)
+        purchaser = get_object_or_404(Purchaser.objects.all(), pk=get_profile_id(request.user))
         if request.method == "GET":
             serializer = PurchaserSerializer(purchaser)
             return Response(serializer.data)
@@ -104,8 +166,13 @@ class PurchaserViewset(mixins.ListModelMixin, mixins.RetrieveModelMixin, Generic
             return Response(serializer.data)
 
 
+SPARSE_FIELDS_PARAMETER = OpenApiParameter(
+    "fields", str, description="Comma separated `PO` fields to return, e.g. `id,status`. Defaults to every field")
+
+
 class PurchaseOrderViewSet(ModelViewSet):
     http_method_names = ("get", "post", "put", "delete", "head", "options")
+    pagination_class = PurchaseOrderPagination
 
     @property
     def filterset_class(self):
@@ -113,9 +180,12 @@ class PurchaseOrderViewSet(ModelViewSet):
             return VendorFilter
         elif self.request.user.account_type == "V":
             return PurchaserFilter
+        return PurchaseOrderFilter
 
     def get_serializer_class(self):
         if self.request.method == "POST":
+            if self.action == "bulk":
+                return BulkCreatePurchaseOrderSerializer
             return CreatePurchaseOrderSerializer
         elif self.request.method == "GET":
             if self.request.user.account_type == "V":
@@ -127,6 +197,10 @@ class PurchaseOrderViewSet(ModelViewSet):
         elif self.request.method == "PUT":
             if self.action == "acknowledge":
                 return VendorAcknowledgePurchaseOrderSerializer
+            if self.action == "bulk_acknowledge":
+                return BulkAcknowledgePurchaseOrderSerializer
+            if self.action == "bulk_delivery":
+                return BulkDeliveryPurchaseOrderSerializer
             if self.action == "delivery":
                 return VendorDeliveryPurchaseOrderSerializer
             elif self.action == "rating":
@@ -143,7 +217,7 @@ class PurchaseOrderViewSet(ModelViewSet):
         elif self.request.method == "POST":
             return [IsPurchaser()]
         elif self.request.method == "PUT":
-            if self.action in ["acknowledge", "delivery"]:
+            if self.action in ["acknowledge", "delivery", "bulk_acknowledge", "bulk_delivery"]:
                 return [IsVendor()]
             elif self.action == "rating":
                 return [IsPurchaser()]
@@ -156,27 +230,110 @@ class PurchaseOrderViewSet(ModelViewSet):
         user = self.request.user
 
         if user.account_type == "V":
-            queryset = queryset.filter(vendor__user_id=user.pk)
+            queryset = queryset.filter(vendor_id=get_profile_id(user))
         elif user.account_type == "P":
-            queryset = queryset.filter(purchaser__user_id=user.pk)
+            queryset = queryset.filter(purchaser_id=get_profile_id(user))
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # The cursor is built from the ordering fields, keep them loaded
+            ordering = [field.lstrip("-")
+                        for field in self.pagination_class.ordering]
+            queryset = queryset.only("id", *ordering, *fields)
         return queryset
 
-    def get_serializer_context(self):
-        try:
-            purchaser = Purchaser.objects.get(user_id=self.request.user.pk)
-        except Purchaser.DoesNotExist:
-            purchaser = None
-        return {"purchaser": purchaser}
+    def get_sparse_fields(self) -> list[str] | None:
+        """ Fields requested through `?fields=` on reads, None when every field is wanted """
+        if self.action not in ["list", "retrieve", "export"] or "fields" not in self.request.query_params:
+            return None
+        fields = [field.strip() for field in self.request.query_params["fields"].split(",")
+                  if field.strip()]
+        unknown_fields = set(fields) - \
+            set(self.get_serializer_class().Meta.fields)
+        if unknown_fields:
+            raise ValidationError(
+                {"fields": [f"Unknown fields: {', '.join(sorted(unknown_fields))}"]})
+        elif not fields:
+            raise ValidationError({"fields": ["Provide at least one field."]})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
 
-    @extend_schema(description="Returns the list of `POs` based on `Permissions`. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="List the `PO`s", responses=AdminPurchaseOrderSerializer)
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ["create", "bulk"]:
+            # Only purchasers create, see `get_permissions`
+            context["purchaser"] = get_profile(self.request.user)
+        elif self.action in ["bulk_acknowledge", "bulk_delivery"]:
+            context["purchase_orders"] = self.get_queryset()
+        return context
+
+    @extend_schema(description="Returns the list of `POs` based on `Permissions`. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="List the `PO`s", responses=AdminPurchaseOrderSerializer, parameters=[SPARSE_FIELDS_PARAMETER])
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        # Rows are read with `values_list` and rendered without building model instances
+        serializer = ValuesListSerializer(
+            self.get_serializer_class(), fields=self.get_sparse_fields())
+        ordering = [field.lstrip("-") for field in self.pagination_class.ordering
+                    if field.lstrip("-") not in serializer.columns]
+        queryset = self.filter_queryset(self.get_queryset()) \
+            .values_list(*serializer.columns, *ordering, named=True)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
+
+    @extend_schema(description="Streams every `PO` based on `Permissions` as CSV (`?format=csv`, default) or newline delimited JSON (`?format=ndjson`). *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Export the `PO`s", parameters=[SPARSE_FIELDS_PARAMETER], responses={(200, "text/csv"): OpenApiTypes.STR, (200, "application/x-ndjson"): OpenApiTypes.STR})
+    @action(detail=False, methods=["GET"], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request: Request):
+        serializer = ValuesListSerializer(
+            self.get_serializer_class(), fields=self.get_sparse_fields())
+        keys = [key for key in ("ordered_date", "id")
+                if key not in serializer.columns]
+        queryset = self.filter_queryset(self.get_queryset()) \
+            .order_by(*PurchaseOrderPagination.ordering) \
+            .values_list(*serializer.columns, *keys, named=True)
+
+        def chunks():
+            # Keyset chunks in the list order, memory stays bound by one chunk whatever the
+            # number of orders (and whether or not the backend streams its cursors)
+            rows = queryset
+            while chunk := list(rows[:settings.EXPORT_CHUNK_SIZE]):
+                yield serializer.to_representation(chunk)
+                last = chunk[-1]
+                rows = queryset.filter(Q(ordered_date__lt=last.ordered_date) | Q(
+                    ordered_date=last.ordered_date, id__lt=last.id))
+
+        renderer = request.accepted_renderer
+        content_type = f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+        response = StreamingHttpResponse(
+            renderer.stream(chunks(), serializer.names), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="purchase_orders.{renderer.format}"'
+        return response
 
     @extend_schema(description="Takes `Vendor ID` and `PO Items` and Returns created `PO ID`. *Allowed Users*: [`Purchaser`]", summary="Create a new `PO`")
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
-    @extend_schema(description="Takes `PO ID` and Returns corresponding `PO detials`. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Retrive the `PO` details")
+    @extend_schema(description="Takes a list of `Vendor ID` and `PO Items` entries (at most `MAX_BULK_PURCHASE_ORDERS`), creates the valid ones in one transaction and Returns the created `PO ID` or the errors of every entry, in order. Responds `201` when every entry is created, `207` when some are and `400` when none. *Allowed Users*: [`Purchaser`]", summary="Create `PO`s in bulk", request=CreatePurchaseOrderSerializer(many=True), responses={201: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT})
+    @action(detail=False, methods=["POST"])
+    def bulk(self, request: Request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        purchase_orders = serializer.save()
+        if len(purchase_orders) == len(serializer.validated_data):
+            response_status = status.HTTP_201_CREATED
+        elif purchase_orders:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(serializer.data, status=response_status)
+
+    @extend_schema(description="Takes `PO ID` and Returns corresponding `PO detials`. *Allowed Users*: [`Admin`, `Vendor`, `Purchaser`]", summary="Retrive the `PO` details", parameters=[SPARSE_FIELDS_PARAMETER])
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -240,6 +397,28 @@ class PurchaseOrderViewSet(ModelViewSet):
             return Response({"message": "Purchase Order delivered successfully"})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(description="Takes `PO ID`s and `Expected Delivery Date` and perform acknowledge of every pending `PO` in one go and Returns the outcome of each `PO`, in order. Responds `200` when every `PO` is acknowledged, `207` when some are and `400` when none. *Allowed Users*: [`Vendor`]", summary="Acknowledge issued `PO`s in bulk", responses={200: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT})
+    @action(detail=False, methods=["PUT"], url_path="bulk/acknowledge")
+    def bulk_acknowledge(self, request: Request):
+        return self.bulk_transition(request)
+
+    @extend_schema(description="Takes `PO ID`s and perform delivery of every acknowledged `PO` in one go and Returns the outcome of each `PO`, in order. Responds `200` when every `PO` is delivered, `207` when some are and `400` when none. *Allowed Users*: [`Vendor`]", summary="Deliver issued `PO`s in bulk", responses={200: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT})
+    @action(detail=False, methods=["PUT"], url_path="bulk/delivery")
+    def bulk_delivery(self, request: Request):
+        return self.bulk_transition(request)
+
+    def bulk_transition(self, request: Request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        purchase_orders = serializer.save()
+        if len(purchase_orders) == len(serializer.validated_data["purchase_orders"]):
+            response_status = status.HTTP_200_OK
+        elif purchase_orders:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(serializer.data, status=response_status)
+
     @extend_schema(description="Takes `PO ID` and return `Quality Rating` (Utility api for prepopulating `Quality Rating` in DRF Browsable API). *Allowed Users*: [`Purchaser`]", methods=["GET"], summary="Utility API for DRF Browsable API")
     @extend_schema(description="Takes `PO ID` and `Quality Rating` and perform rating and Returns confirmation message. *Allowed Users*: [`Purchaser`]", methods=["PUT"], summary="Rating the delivered `PO`")
     @action(detail=True, methods=["GET", "PUT", "OPTIONS", "HEAD"])